@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 import logging
 
 from app.api.api_v1 import api_router as api_v1_router
+from app.api.endpoints.crawler import crawler_manager
 from app.core.config import settings
 from app.core.database import Base, engine, get_db
 from app.db.init_db import init_db
@@ -218,4 +219,6 @@ async def startup_event():
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    logger.info("Shutting down application")
\ No newline at end of file
+    logger.info("Shutting down application")
+    # Release the HTTP connections shared by all crawl jobs
+    await crawler_manager.close()
\ No newline at end of file
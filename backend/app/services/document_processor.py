@@ -56,26 +56,49 @@ class DocumentProcessor:
         """Get the path to the vectorstore for a website."""
         return os.path.join(self.embeddings_dir, f"website_{website_id}")
 
+    def _load_crawled_documents(self, website_dir: str) -> List[Dict[str, Any]]:
+        """Load the crawler's documents for a website, keeping the latest copy of each URL.
+
+        Pages are stored as JSON lines in sharded ``.jsonl`` files, where a
+        re-crawled page is appended again; older crawls wrote one ``.json``
+        file per page.
+        """
+        documents: Dict[str, Dict[str, Any]] = {}
+
+        for filename in os.listdir(website_dir):
+            try:
+                if filename.endswith(".jsonl"):
+                    with open(os.path.join(website_dir, filename), 'r') as f:
+                        for line in f:
+                            try:
+                                document = json.loads(line)
+                            except ValueError:
+                                # A torn last line from an interrupted crawl
+                                continue
+                            if document.get('url'):
+                                documents[document['url']] = document
+                elif filename.endswith(".json"):
+                    with open(os.path.join(website_dir, filename), 'r') as f:
+                        document = json.load(f)
+                        if document.get('url'):
+                            documents.setdefault(document['url'], document)
+            except Exception as e:
+                logger.error(f"Error loading document {filename}: {str(e)}")
+
+        return list(documents.values())
+
     def get_website_documents(self, website_id: int) -> List[Dict[str, Any]]:
         """Load all documents for a website from the crawler data."""
         website_dir = os.path.join(self.content_dir, str(website_id))
-        documents = []
 
         if not os.path.exists(website_dir):
             logger.warning(f"No content directory found for website {website_id}")
             return []
 
-        for filename in os.listdir(website_dir):
-            if filename.endswith(".json"):
-                try:
-                    with open(os.path.join(website_dir, filename), 'r') as f:
-                        document = json.load(f)
-                        if document.get('url') and not self.is_url_processed(document['url']):
-                            documents.append(document)
-                except Exception as e:
-                    logger.error(f"Error loading document {filename}: {str(e)}")
-
-        return documents
+        return [
+            document for document in self._load_crawled_documents(website_dir)
+            if not self.is_url_processed(document['url'])
+        ]
 
     def process_website(self, website_id: int, batch_size: int = 100) -> Dict[str, Any]:
         """
@@ -167,15 +190,8 @@ class DocumentProcessor:
             # Clear processed URLs for this website
             website_dir = os.path.join(self.content_dir, str(website_id))
             if os.path.exists(website_dir):
-                for filename in os.listdir(website_dir):
-                    if filename.endswith(".json"):
-                        try:
-                            with open(os.path.join(website_dir, filename), 'r') as f:
-                                document = json.load(f)
-                                if document.get('url') and document['url'] in self.processed_urls:
-                                    del self.processed_urls[document['url']]
-                        except Exception as e:
-                            logger.error(f"Error loading document {filename}: {str(e)}")
+                for document in self._load_crawled_documents(website_dir):
+                    self.processed_urls.pop(document['url'], None)
 
                 self._save_processed_urls()
 
@@ -1,15 +1,15 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, select
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import QueuePool
 import os
 import sys
 import logging
 from datetime import timedelta
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging; WARNING keeps fixtures quiet, bump to INFO when debugging one
+logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 
 # Add project root to path
@@ -17,20 +17,31 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from app.main import app
 from app.core.database import get_db, Base
-from app.core.security import get_password_hash, create_access_token
+from app.core.security import get_password_hash, create_access_token, pwd_context
 from app.models.user import User
 from app.core.config import settings
 
-# Create in-memory SQLite database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# Create a shared-cache in-memory SQLite database for testing, so every pooled
+# connection sees the same schema and data without touching disk
+SQLALCHEMY_DATABASE_URL = "sqlite:///file:testdb?mode=memory&cache=shared&uri=true"
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
+    connect_args={"uri": True, "check_same_thread": False},
+    poolclass=QueuePool,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # The test DB is thrown away after the run, so durability is pure overhead
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
 # Override get_db dependency
 def override_get_db():
     try:
@@ -42,63 +53,89 @@ def override_get_db():
 
 app.dependency_overrides[get_db] = override_get_db
 
+# Use the minimum bcrypt cost so hashing/verifying test passwords takes
+# milliseconds instead of ~100ms (tests/util/test_bcrypt.py restores full cost)
+pwd_context.update(bcrypt__rounds=4)
+
 # Test user credentials
 TEST_USER_EMAIL = "admin@example.com"
 TEST_USER_PASSWORD = "password"
 TEST_NORMAL_USER_EMAIL = "user@example.com"
 TEST_NORMAL_USER_PASSWORD = "password"
 
+# Set up once per session in pytest_configure
+_keeper_conn = None
+_test_password_hash = None
+
+
+def pytest_configure(config):
+    """One-time setup: create the schema and hash the shared test password."""
+    global _keeper_conn, _test_password_hash
+    # Holding a connection open keeps the shared-cache in-memory DB alive for the whole run
+    _keeper_conn = engine.connect()
+    Base.metadata.create_all(bind=engine)
+
+    # Both test users share one password, so hash it once
+    _test_password_hash = get_password_hash(TEST_USER_PASSWORD)
+    logger.info("Created hashed_password: %s...", _test_password_hash[:10])
+
+
+def pytest_unconfigure(config):
+    global _keeper_conn
+    if _keeper_conn is not None:
+        _keeper_conn.close()
+        _keeper_conn = None
+    engine.dispose()
+
 
 @pytest.fixture(scope="function")
 def test_db():
     """Create a clean test database with test users for each test."""
-    # Drop all tables if they exist
-    Base.metadata.drop_all(bind=engine)
+    # Other test modules install their own get_db override at import time,
+    # so make sure requests in this test hit this database
+    app.dependency_overrides[get_db] = override_get_db
 
-    # Create tables
-    Base.metadata.create_all(bind=engine)
+    # The schema is created once in pytest_configure; just empty the tables
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
 
     # Create session
     db = TestingSessionLocal()
 
     try:
-        # Create a consistent password hash
-        password_hash = get_password_hash(TEST_USER_PASSWORD)
-        logger.info(f"Created hashed_password: {password_hash[:10]}...")
-
-        # Add test data - create a test superuser
-        test_user = User(
-            email=TEST_USER_EMAIL,
-            hashed_password=password_hash,
-            full_name="Test Admin",
-            is_active=True,
-            is_superuser=True
-        )
-        db.add(test_user)
-
-        # Create regular user
-        normal_user = User(
-            email=TEST_NORMAL_USER_EMAIL,
-            hashed_password=password_hash,  # Use same hash for simplicity
-            full_name="Test User",
-            is_active=True,
-            is_superuser=False
-        )
-        db.add(normal_user)
+        password_hash = _test_password_hash
+
+        # Add test data - a test superuser and a regular user in a single INSERT
+        db.execute(User.__table__.insert(), [
+            {
+                "email": TEST_USER_EMAIL,
+                "hashed_password": password_hash,
+                "full_name": "Test Admin",
+                "is_active": True,
+                "is_superuser": True
+            },
+            {
+                "email": TEST_NORMAL_USER_EMAIL,
+                "hashed_password": password_hash,  # Use same hash for simplicity
+                "full_name": "Test User",
+                "is_active": True,
+                "is_superuser": False
+            },
+        ])
 
         # Commit both users
         db.commit()
 
-        # Refresh to get IDs
-        db.refresh(test_user)
-        db.refresh(normal_user)
-
-        logger.info(f"Created test user: {test_user.email} - ID: {test_user.id}")
-        logger.info(f"Created normal user: {normal_user.email} - ID: {normal_user.id}")
+        # Fetch both IDs in one query instead of refreshing each user, and only
+        # when someone will actually see the log line
+        if logger.isEnabledFor(logging.INFO):
+            for user_id, email in db.execute(select(User.id, User.email)):
+                logger.info("Created test user: %s - ID: %s", email, user_id)
 
         yield db
     except Exception as e:
-        logger.error(f"Error in test_db fixture: {str(e)}")
+        logger.error("Error in test_db fixture: %s", e)
         db.rollback()
         raise
     finally:
@@ -108,7 +145,15 @@ def test_db():
 
 @pytest.fixture
 def client(test_db):
-    # Create a test client using the testing database
+    # Create a test client using the testing database. Not entering the client
+    # as a context manager skips the startup/shutdown events, which route tests
+    # don't need.
+    yield TestClient(app, raise_server_exceptions=True)
+
+
+@pytest.fixture
+def client_with_lifespan(test_db):
+    # Test client that also runs the application's startup/shutdown events
     with TestClient(app) as c:
         yield c
 
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The crawler package lives at the repository root, next to the backend
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
@@ -0,0 +1,52 @@
+"""Stand-ins for aiohttp sessions and responses shared by the crawler tests."""
+
+import asyncio
+from typing import Dict, Optional
+
+
+class FakeContent:
+    """A response's content stream, handing out the body in the sizes asked for."""
+
+    def __init__(self, body: bytes):
+        self._body = body
+
+    async def read(self, n: int = -1) -> bytes:
+        if n < 0:
+            n = len(self._body)
+        chunk, self._body = self._body[:n], self._body[n:]
+        return chunk
+
+
+class FakeResponse:
+    """A 200 response with the given body, or a 404 when there is none."""
+
+    def __init__(self, body: bytes, charset: Optional[str] = None):
+        self.status = 200 if body else 404
+        self.charset = charset
+        self.content = FakeContent(body)
+        self._body = body
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self) -> str:
+        return self._body.decode(self.charset or 'utf-8')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """Stands in for aiohttp.ClientSession, serving pages by URL and recording when each request starts."""
+
+    def __init__(self, pages: Dict[str, bytes], charset: Optional[str] = None):
+        self.pages = pages
+        self.charset = charset
+        self.requests = []
+
+    def get(self, url, **kwargs):
+        self.requests.append((url, asyncio.get_running_loop().time()))
+        return FakeResponse(self.pages.get(url, b""), self.charset)
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import os
+
+from app.services.document_processor import DocumentProcessor
+from crawler.manager.crawler_manager import CrawlerManager, _url_key
+
+WEBSITE_ID = 7
+
+
+def page(url, title):
+    return {"url": url, "title": title, "content": f"Content of {title}", "metadata": {"url": url}}
+
+
+def save_pages(manager, pages):
+    async def run():
+        for content in pages:
+            await manager._save_content(WEBSITE_ID, content)
+
+    asyncio.run(run())
+
+
+def website_dir(tmp_path):
+    return os.path.join(str(tmp_path), "crawler", "content", str(WEBSITE_ID))
+
+
+def load_documents(tmp_path):
+    processor = DocumentProcessor(storage_dir=str(tmp_path))
+    documents = processor._load_crawled_documents(website_dir(tmp_path))
+    return {document["url"]: document["title"] for document in documents}
+
+
+def test_saved_pages_round_trip_through_the_sharded_store(tmp_path):
+    manager = CrawlerManager(os.path.join(str(tmp_path), "crawler"))
+    urls = [f"https://example.com/page/{i}" for i in range(20)]
+    save_pages(manager, [page(url, f"Page {i}") for i, url in enumerate(urls)])
+
+    assert CrawlerManager._stored_url_keys(website_dir(tmp_path)) == {_url_key(url) for url in urls}
+    assert load_documents(tmp_path) == {url: f"Page {i}" for i, url in enumerate(urls)}
+    # Pages are grouped into shards by key prefix, each with its key list
+    filenames = os.listdir(website_dir(tmp_path))
+    assert {name[-5:] for name in filenames} == {"jsonl", ".keys"}
+    assert len(filenames) < 2 * len(urls)
+
+
+def test_a_recrawled_page_is_loaded_once_with_its_latest_content(tmp_path):
+    manager = CrawlerManager(os.path.join(str(tmp_path), "crawler"))
+    url = "https://example.com/news"
+    save_pages(manager, [page(url, "First crawl"), page("https://example.com/other", "Other"), page(url, "Second crawl")])
+
+    assert CrawlerManager._stored_url_keys(website_dir(tmp_path)) == {_url_key(url), _url_key("https://example.com/other")}
+    assert load_documents(tmp_path) == {url: "Second crawl", "https://example.com/other": "Other"}
+
+
+def test_legacy_per_page_files_are_read_alongside_shards(tmp_path):
+    manager = CrawlerManager(os.path.join(str(tmp_path), "crawler"))
+    save_pages(manager, [page("https://example.com/both", "Sharded")])
+
+    # Crawls from before sharding wrote one <url key>.json file per page
+    for url, title in (("https://example.com/legacy", "Legacy"), ("https://example.com/both", "Legacy copy")):
+        with open(os.path.join(website_dir(tmp_path), f"{_url_key(url)}.json"), "w") as f:
+            json.dump(page(url, title), f)
+
+    assert CrawlerManager._stored_url_keys(website_dir(tmp_path)) == {
+        _url_key("https://example.com/both"), _url_key("https://example.com/legacy")
+    }
+    assert load_documents(tmp_path) == {"https://example.com/both": "Sharded", "https://example.com/legacy": "Legacy"}
+
+
+def test_a_torn_last_line_is_skipped(tmp_path):
+    manager = CrawlerManager(os.path.join(str(tmp_path), "crawler"))
+    url = "https://example.com/page"
+    save_pages(manager, [page(url, "Saved")])
+
+    shard_path = os.path.join(website_dir(tmp_path), f"{_url_key(url)[:2]}.jsonl")
+    with open(shard_path, "a") as f:
+        f.write('{"url": "https://example.com/page", "title": "Torn')
+
+    assert load_documents(tmp_path) == {url: "Saved"}
+
+
+def test_pages_saved_after_a_torn_line_are_read_back(tmp_path):
+    storage_dir = os.path.join(str(tmp_path), "crawler")
+    url = "https://example.com/page"
+    # Another URL stored in the same shard
+    neighbour = next(
+        f"https://example.com/other/{i}" for i in range(10000)
+        if _url_key(f"https://example.com/other/{i}")[:2] == _url_key(url)[:2]
+    )
+    save_pages(CrawlerManager(storage_dir), [page(url, "First crawl")])
+
+    # A crash mid-append leaves a partial line at the end of the shard and its keys file
+    shard = os.path.join(website_dir(tmp_path), _url_key(url)[:2])
+    with open(f"{shard}.jsonl", "a") as f:
+        f.write('{"url": "https://example.com/page", "title": "Torn')
+    with open(f"{shard}.keys", "a") as f:
+        f.write(_url_key(url)[:7])
+
+    # The next run appends after it
+    save_pages(CrawlerManager(storage_dir), [page(url, "Second crawl"), page(neighbour, "Neighbour")])
+
+    assert load_documents(tmp_path) == {url: "Second crawl", neighbour: "Neighbour"}
+    assert {_url_key(url), _url_key(neighbour)} <= CrawlerManager._stored_url_keys(website_dir(tmp_path))
+
+
+def test_a_website_without_content_has_no_stored_keys(tmp_path):
+    assert CrawlerManager._stored_url_keys(website_dir(tmp_path)) == set()
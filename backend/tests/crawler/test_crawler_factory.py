@@ -0,0 +1,28 @@
+import asyncio
+
+from crawler.factory.crawler_factory import CrawlerFactory
+from fakes import FakeSession
+
+URL = "https://example.com/"
+# Pushes later markup well past the top of the page
+FILLER = '<p>' + 'x' * 32 * 1024 + '</p>'
+
+
+def detect(body: str) -> str:
+    session = FakeSession({URL: body.encode()}, charset='utf-8')
+    return asyncio.run(CrawlerFactory.detect_website_type(URL, session=session))
+
+
+def test_ecommerce_markup_further_down_outranks_a_blog_marker_near_the_top():
+    body = f'<html><body><div class="post">Hi</div>{FILLER}<div class="products"></div></body></html>'
+    assert detect(body) == "ecommerce"
+
+
+def test_documentation_markup_further_down_outranks_a_blog_marker_near_the_top():
+    body = f'<html><body><article>Hi</article>{FILLER}<div class="docs"></div></body></html>'
+    assert detect(body) == "documentation"
+
+
+def test_ecommerce_markup_outranks_documentation_markup_further_down():
+    body = f'<html><body><div class="products"></div>{FILLER}<div class="docs"></div></body></html>'
+    assert detect(body) == "ecommerce"
@@ -0,0 +1,25 @@
+import asyncio
+
+from crawler.manager.crawler_manager import CrawlerManager
+
+
+def test_progress_appended_while_a_snapshot_is_written_is_kept(tmp_path):
+    async def run():
+        manager = CrawlerManager(str(tmp_path))
+        job = manager.create_job(1, "https://example.com")
+        job.status = "running"
+        job.processed_urls = job.successful_urls = 1
+
+        save = asyncio.create_task(manager._save_job_metadata_async(job, force=True))
+        # Let the snapshot start writing, then record more progress before it finishes
+        await asyncio.sleep(0)
+        job.processed_urls = job.successful_urls = 2
+        await manager._append_progress(job, "https://example.com/2")
+        await save
+        return job.id
+
+    job_id = asyncio.run(run())
+
+    reloaded = CrawlerManager(str(tmp_path))
+    reloaded.load_jobs()
+    assert reloaded.get_job(job_id).processed_urls == 2
@@ -0,0 +1,94 @@
+import asyncio
+
+from crawler.domain.domain_crawler import BlogCrawler
+from fakes import FakeSession
+
+# A site template with plenty of shared navigation and footer text, and a counter
+TEMPLATE = """<html><head><title>{title}</title></head><body>
+<nav>Home About Archive Contact Subscribe Newsletter Categories Tags Search Login</nav>
+<article><h1>{title}</h1>{body}</article>
+<footer>Copyright Example Blog. All rights reserved. Visitors today: {visitors}.
+Follow us on every social network for more posts about everything and anything.</footer>
+</body></html>"""
+
+
+def make_page(title, sentences, visitors=1):
+    body = ''.join(f'<p>{sentence}</p>' for sentence in sentences)
+    return TEMPLATE.format(title=title, body=body, visitors=visitors)
+
+
+def make_crawler():
+    crawler = BlogCrawler("https://example.com", "TestBot")
+    crawler.use_process_pool = False
+    return crawler
+
+
+def process_all(crawler, pages):
+    async def run():
+        return [await crawler.process(html, url) for url, html in pages]
+
+    return asyncio.run(run())
+
+
+def test_distinct_pages_sharing_a_template_are_kept():
+    pages = [
+        ("https://example.com/blog/1", make_page("Release 1.2", [
+            "Version 1.2 ships with a faster indexer and new settings.",
+            "Upgrade from 1.1 by running the migration script once.",
+        ])),
+        ("https://example.com/blog/2", make_page("Release 1.3", [
+            "Version 1.3 ships with a faster indexer and new settings.",
+            "Upgrade from 1.2 by running the migration script once.",
+        ])),
+        ("https://example.com/blog/3", make_page("Gardening tips", [
+            "Tomatoes need plenty of sun and regular watering in summer.",
+            "Prune the side shoots so the plant puts energy into fruit.",
+        ])),
+    ]
+
+    results = process_all(make_crawler(), pages)
+
+    assert [content.get("error") for content, _ in results] == [None, None, None]
+    assert [content["title"] for content, _ in results] == ["Release 1.2", "Release 1.3", "Gardening tips"]
+
+
+def test_repeated_page_with_only_a_new_counter_is_skipped():
+    sentences = ["A long post about crawling websites politely and efficiently, with examples."] * 20
+    pages = [
+        ("https://example.com/blog/post", make_page("Crawling", sentences, visitors=10)),
+        ("https://example.com/blog/post?ref=feed", make_page("Crawling", sentences, visitors=11)),
+    ]
+
+    first, second = process_all(make_crawler(), pages)
+
+    assert "error" not in first[0]
+    assert second[0]["error"] == "Near-duplicate of a previously processed page"
+    assert second[1] == []
+
+
+def test_author_meta_tag_is_preferred_over_an_author_link():
+    html = """<html><head><meta name="author" content="Meta Author"></head><body>
+<article><p>Some post text that is long enough to keep.</p><a rel="author" href="/me">Link Author</a></article>
+</body></html>"""
+
+    content = asyncio.run(make_crawler().extract_content(html, "https://example.com/blog/post"))
+
+    assert content["metadata"]["author"] == "Meta Author"
+
+
+def test_fetch_url_decodes_with_the_meta_charset_when_the_header_has_none():
+    html = '<html><head><meta charset="windows-1251"></head><body><p>Привет, мир</p></body></html>'
+    session = FakeSession({"https://example.com/ru": html.encode('windows-1251')})
+
+    fetched = asyncio.run(make_crawler().fetch_url("https://example.com/ru", session))
+
+    assert "Привет, мир" in fetched
+
+
+def test_fetch_url_prefers_the_header_charset_over_the_meta_tag():
+    html = '<html><head><meta charset="windows-1251"></head><body><p>café</p></body></html>'
+    session = FakeSession({"https://example.com/fr": html.encode('utf-8')}, charset='utf-8')
+
+    fetched = asyncio.run(make_crawler().fetch_url("https://example.com/fr", session))
+
+    assert "café" in fetched
@@ -0,0 +1,87 @@
+import asyncio
+
+from crawler.robots.robots_parser import RobotsParser
+
+ROBOTS = {
+    "https://example.com": "User-agent: *\nDisallow: /private\nDisallow: /tmp/\n\nUser-agent: testbot\nDisallow: /drafts\n",
+    "https://other.example.com": "User-agent: *\nDisallow: /\n",
+    "http://example.com": None,
+}
+
+
+def make_parser(user_agent="RAGCrawler"):
+    parser = RobotsParser(user_agent)
+    fetched = []
+
+    async def fetch_robots_txt(base_url):
+        fetched.append(base_url)
+        return ROBOTS[base_url]
+
+    parser.fetch_robots_txt = fetch_robots_txt
+    return parser, fetched
+
+
+def test_get_allowed_urls_filters_each_url_by_its_hosts_rules_in_order():
+    parser, fetched = make_parser()
+    urls = [
+        "https://example.com/",
+        "https://example.com/private/page",
+        "https://example.com/blog/post?page=2",
+        "https://other.example.com/anything",
+        "https://example.com/tmp/file",
+        "http://example.com/private/page",
+        "https://example.com",
+        "https://example.com/drafts/one",
+        "https://example.com/privateer",
+    ]
+
+    allowed = asyncio.run(parser.get_allowed_urls("https://example.com", urls))
+
+    assert allowed == [
+        "https://example.com/",
+        "https://example.com/blog/post?page=2",
+        "http://example.com/private/page",
+        "https://example.com",
+        "https://example.com/drafts/one",
+    ]
+    # robots.txt is fetched once per host, however many of its URLs are checked
+    assert sorted(fetched) == sorted(ROBOTS)
+
+
+def test_get_allowed_urls_uses_the_group_for_its_own_user_agent():
+    parser, _ = make_parser("TestBot")
+    urls = ["https://example.com/drafts/one", "https://example.com/private/page"]
+
+    assert asyncio.run(parser.get_allowed_urls("https://example.com", urls)) == ["https://example.com/private/page"]
+
+
+def test_get_allowed_urls_with_no_urls_fetches_nothing():
+    parser, fetched = make_parser()
+
+    assert asyncio.run(parser.get_allowed_urls("https://example.com", [])) == []
+    assert fetched == []
+
+
+def test_disk_cache_keeps_http_and_https_rules_apart(tmp_path):
+    robots = {
+        "https://example.com": "User-agent: *\nDisallow: /private\n",
+        "http://example.com": "User-agent: *\nDisallow: /\n",
+    }
+    urls = ["https://example.com/page", "http://example.com/page"]
+
+    async def crawl_once():
+        parser = RobotsParser(cache_dir=str(tmp_path))
+        fetched = []
+
+        async def fetch_robots_txt(base_url):
+            fetched.append(base_url)
+            return robots[base_url]
+
+        parser.fetch_robots_txt = fetch_robots_txt
+        allowed = [(await parser.is_allowed(url))[0] for url in urls]
+        await parser.close()
+        return allowed, fetched
+
+    assert asyncio.run(crawl_once()) == ([True, False], ["https://example.com", "http://example.com"])
+    # A fresh parser answers both from the disk cache, each with its own scheme's rules
+    assert asyncio.run(crawl_once()) == ([True, False], [])
@@ -0,0 +1,67 @@
+import asyncio
+
+from crawler.crawler.sitemap_crawler import EnhancedSitemapCrawler
+from fakes import FakeSession
+
+DELAY = 0.05
+
+
+def make_crawler():
+    crawler = EnhancedSitemapCrawler("https://example.com", "TestBot")
+    crawler.default_crawl_delay = DELAY
+    return crawler
+
+
+def request_gaps(session):
+    times = sorted(started for _, started in session.requests)
+    return [later - earlier for earlier, later in zip(times, times[1:])]
+
+
+def test_concurrent_fetches_to_one_domain_are_spaced_by_the_delay():
+    async def run():
+        crawler = make_crawler()
+        session = FakeSession({f"https://example.com/{i}": b"<html></html>" for i in range(5)})
+        await asyncio.gather(*(crawler.fetch_url(f"https://example.com/{i}", session) for i in range(5)))
+        return session
+
+    session = asyncio.run(run())
+
+    assert len(session.requests) == 5
+    assert all(gap >= DELAY * 0.9 for gap in request_gaps(session))
+
+
+def test_robots_crawl_delay_raises_the_domain_delay():
+    async def run():
+        crawler = make_crawler()
+        crawler.crawl_delays["example.com"] = DELAY * 2
+        session = FakeSession({f"https://example.com/{i}": b"<html></html>" for i in range(3)})
+        await asyncio.gather(*(crawler.fetch_url(f"https://example.com/{i}", session) for i in range(3)))
+        return session
+
+    session = asyncio.run(run())
+
+    assert all(gap >= DELAY * 2 * 0.9 for gap in request_gaps(session))
+
+
+def test_sub_sitemaps_of_an_index_are_fetched_at_the_crawl_delay():
+    children = [f"https://example.com/sitemap-{i}.xml" for i in range(4)]
+    index = ('<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+             + "".join(f"<sitemap><loc>{child}</loc></sitemap>" for child in children)
+             + "</sitemapindex>").encode()
+    pages = {
+        child: ('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                f"<url><loc>https://example.com/page-{i}</loc></url></urlset>").encode()
+        for i, child in enumerate(children)
+    }
+
+    async def run():
+        crawler = make_crawler()
+        session = FakeSession(pages)
+        urls = await crawler.parse_sitemap(index, session)
+        return urls, session
+
+    urls, session = asyncio.run(run())
+
+    assert sorted(url_data["url"] for url_data in urls) == [f"https://example.com/page-{i}" for i in range(4)]
+    assert sorted(url for url, _ in session.requests) == children
+    assert all(gap >= DELAY * 0.9 for gap in request_gaps(session))
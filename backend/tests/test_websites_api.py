@@ -17,10 +17,8 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Override get_db dependency
-Base.metadata.create_all(bind=engine)
-
 
+# Override get_db dependency
 def override_get_db():
     db = TestingSessionLocal()
     try:
@@ -37,6 +35,7 @@ client = TestClient(app)
 @pytest.fixture
 def db():
     # Create clean database for each test
+    app.dependency_overrides[get_db] = override_get_db
     Base.metadata.create_all(bind=engine)
     try:
         db = TestingSessionLocal()
@@ -1,4 +1,5 @@
 import logging
+from app.core import security
 from app.core.security import get_password_hash, verify_password
 
 logging.basicConfig(level=logging.DEBUG)
@@ -7,24 +8,30 @@ logger = logging.getLogger(__name__)
 
 def test_bcrypt():
     """Test if bcrypt password hashing is working."""
-    password = "testpassword"
-
-    # Hash the password
-    hashed = get_password_hash(password)
-    logger.info(f"Password: {password}")
-    logger.info(f"Hashed: {hashed}")
-
-    # Verify the password
-    is_valid = verify_password(password, hashed)
-    logger.info(f"Password valid: {is_valid}")
-
-    assert is_valid, "Password verification failed"
-
-    # Verify a wrong password
-    is_valid = verify_password("wrongpassword", hashed)
-    logger.info(f"Wrong password valid: {is_valid}")
-
-    assert not is_valid, "Wrong password verification passed incorrectly"
+    # conftest lowers the bcrypt cost for speed; exercise the production cost here
+    original_context = security.pwd_context
+    security.pwd_context = original_context.copy(bcrypt__rounds=12)
+    try:
+        password = "testpassword"
+
+        # Hash the password
+        hashed = get_password_hash(password)
+        logger.info(f"Password: {password}")
+        logger.info(f"Hashed: {hashed}")
+
+        # Verify the password
+        is_valid = verify_password(password, hashed)
+        logger.info(f"Password valid: {is_valid}")
+
+        assert is_valid, "Password verification failed"
+
+        # Verify a wrong password
+        is_valid = verify_password("wrongpassword", hashed)
+        logger.info(f"Wrong password valid: {is_valid}")
+
+        assert not is_valid, "Wrong password verification passed incorrectly"
+    finally:
+        security.pwd_context = original_context
 
 
 if __name__ == "__main__":
@@ -4,74 +4,129 @@ import logging
 import gzip
 import io
 from bs4 import BeautifulSoup
-from typing import List, Dict, Any, Optional, Set
+import lxml.html
+from lxml import etree
+from typing import List, Dict, Any, Optional, Set, Tuple, Union, Callable, Awaitable
 from urllib.parse import urlparse, urljoin
 import xml.etree.ElementTree as ET
 import re
 from datetime import datetime, timedelta
-import time
 
 from crawler.robots.robots_parser import RobotsParser
+from crawler.utils.helpers import browser_headers, create_session, netloc
 
 logger = logging.getLogger(__name__)
 
+# Called with each URL entry as soon as it is discovered
+UrlCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# Sitemap directive in robots.txt; \S+ stops at trailing whitespace so no strip is needed
+_SITEMAP_RE = re.compile(r'(?im)^\s*Sitemap:\s*(\S+)')
+
+# Link prefixes that never point at crawlable pages
+_SKIP_PREFIXES = ('#', 'javascript:', 'mailto:', 'tel:', 'data:', 'ftp:')
+
+_GZIP_MAGIC = b'\x1f\x8b'
+
 
 class EnhancedSitemapCrawler:
     """An enhanced crawler that can handle all sitemap formats and respects robots.txt."""
 
-    def __init__(self, base_url: str, user_agent: str = "RAGCrawler"):
+    def __init__(self, base_url: str, user_agent: str = "RAGCrawler",
+                 session: Optional[aiohttp.ClientSession] = None,
+                 robots_cache_dir: Optional[str] = None):
         self.base_url = base_url.rstrip('/')
         self.parsed_url = urlparse(self.base_url)
         self.domain = self.parsed_url.netloc
         self.user_agent = user_agent
-        self.robots_parser = RobotsParser(user_agent)
-        self.crawl_delays = {}
-        self.headers = {
-            "User-Agent": f"{user_agent}/1.0",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-            "Accept-Encoding": "gzip, deflate",  # Don't include 'br' until we support it
-            "Connection": "keep-alive"
-        }
+        self.robots_parser = RobotsParser(user_agent, session=session, cache_dir=robots_cache_dir)
+        # robots.txt Crawl-delay per domain, once known; raises default_crawl_delay for that domain
+        self.crawl_delays: Dict[str, float] = {}
+        self.headers = browser_headers(user_agent)
         self.discovered_urls = set()
         self.crawled_urls = set()
-        self.last_request_time = {}
+        # Earliest loop time the next request to each domain may start
+        self._next_request_slot: Dict[str, float] = {}
         self.default_crawl_delay = 1.0  # Add this line to fix the error
+        self.max_concurrency = 8  # Upper bound on in-flight requests, for politeness
+        self._fetch_semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._session = session
+        self._owns_session = session is None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the session sitemaps and pages are fetched with, creating one on first use."""
+        if self._session is None or self._session.closed:
+            self._session = create_session(limit_per_host=self.max_concurrency, keepalive_timeout=60,
+                                           headers=self.headers)
+            self._owns_session = True
+        return self._session
+
+    async def close(self) -> None:
+        """Close the HTTP session if this crawler created it, and the robots.txt session."""
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        await self.robots_parser.close()
+
+    async def _wait_for_rate_limit(self, url: str) -> None:
+        """Reserve the domain's next request slot and sleep until it comes up.
+
+        The slot is claimed before any await, so concurrent fetches to one site get
+        distinct slots spaced by the delay instead of all reading the same timestamp.
+        """
+        domain = netloc(url)
+        delay = max(self.default_crawl_delay, self.crawl_delays.get(domain, 0.0))
+
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self._next_request_slot.get(domain, now))
+        self._next_request_slot[domain] = slot + delay
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def fetch_bytes(self, url: str, session: aiohttp.ClientSession) -> Optional[bytes]:
+        """Fetch the raw body of a URL, skipping text decoding. Used for sitemaps.
+
+        Gzipped bodies (sitemap.xml.gz, usually served as application/x-gzip, which
+        aiohttp does not decode for us) are returned as-is and inflated while parsing.
+        """
+        try:
+            await self._wait_for_rate_limit(url)
+
+            async with self._fetch_semaphore:
+                async with session.get(url, headers=self.headers, allow_redirects=True) as response:
+                    if response.status != 200:
+                        logger.warning(f"Failed to fetch {url}: HTTP {response.status}")
+                        return None
+                    return await response.read()
+        except Exception as e:
+            logger.error(f"Error fetching {url}: {str(e)}")
+            return None
 
     async def fetch_url(self, url: str, session: aiohttp.ClientSession) -> Optional[str]:
         """Fetch the content of a URL with improved content encoding handling."""
         try:
             # Apply rate limiting
-            domain = urlparse(url).netloc
-            if domain in self.last_request_time:
-                time_since_last_request = time.time() - self.last_request_time[domain]
-                if time_since_last_request < self.default_crawl_delay:
-                    await asyncio.sleep(self.default_crawl_delay - time_since_last_request)
-
-            # Make the request
-            self.last_request_time[domain] = time.time()
-
-            # Explicitly specify accepted encodings
-            headers = dict(self.headers)
-            headers['Accept-Encoding'] = 'gzip, deflate'  # Temporarily remove 'br' until we add proper support
-
-            async with session.get(url, headers=headers, allow_redirects=True) as response:
-                if response.status == 200:
-                    try:
-                        return await response.text()
-                    except Exception as e:
-                        # Fallback to raw bytes if text decoding fails
-                        logger.warning(f"Text decoding failed for {url}, trying raw content: {str(e)}")
-                        raw_content = await response.read()
-                        # Try to decode as utf-8 with error handling
+            await self._wait_for_rate_limit(url)
+
+            async with self._fetch_semaphore:
+                async with session.get(url, headers=self.headers, allow_redirects=True) as response:
+                    if response.status == 200:
                         try:
-                            return raw_content.decode('utf-8', errors='replace')
-                        except:
-                            logger.error(f"Failed to decode content from {url}")
-                            return None
-                else:
-                    logger.warning(f"Failed to fetch {url}: HTTP {response.status}")
-                    return None
+                            return await response.text()
+                        except Exception as e:
+                            # Fallback to raw bytes if text decoding fails
+                            logger.warning(f"Text decoding failed for {url}, trying raw content: {str(e)}")
+                            raw_content = await response.read()
+                            # Try to decode as utf-8 with error handling
+                            try:
+                                return raw_content.decode('utf-8', errors='replace')
+                            except:
+                                logger.error(f"Failed to decode content from {url}")
+                                return None
+                    else:
+                        logger.warning(f"Failed to fetch {url}: HTTP {response.status}")
+                        return None
         except Exception as e:
             logger.error(f"Error fetching {url}: {str(e)}")
             return None
@@ -85,9 +140,9 @@ class EnhancedSitemapCrawler:
         robots_content = await self.fetch_url(robots_url, session)
 
         if robots_content:
-            sitemap_matches = re.findall(r'Sitemap:\s*(.*)', robots_content, re.IGNORECASE)
-            if sitemap_matches:
-                sitemap_url = sitemap_matches[0].strip()
+            sitemap_match = _SITEMAP_RE.search(robots_content)
+            if sitemap_match:
+                sitemap_url = sitemap_match.group(1)
                 logger.info(f"Found sitemap URL in robots.txt: {sitemap_url}")
                 return sitemap_url
 
@@ -102,7 +157,7 @@ class EnhancedSitemapCrawler:
 
         for location in common_locations:
             logger.info(f"Checking common sitemap location: {location}")
-            content = await self.fetch_url(location, session)
+            content = await self.fetch_bytes(location, session)
             if content:
                 logger.info(f"Found sitemap at {location}")
                 return location
@@ -110,77 +165,143 @@ class EnhancedSitemapCrawler:
         logger.warning(f"Could not find sitemap for {self.base_url}")
         return None
 
-    async def parse_sitemap(self, sitemap_content: str, session: aiohttp.ClientSession) -> List[Dict[str, Any]]:
-        """Parse the sitemap XML and extract URLs with metadata."""
+    @staticmethod
+    def _build_url_entry(loc: Optional[str], lastmod: Optional[str] = None,
+                         changefreq: Optional[str] = None, priority: Optional[str] = None) -> Dict[str, Any]:
+        """Build a URL entry dict from the raw text of a sitemap <url> element."""
+        url_data = {
+            "url": loc.strip(),
+            "lastmod": lastmod.strip() if lastmod else None,
+            "changefreq": changefreq.strip() if changefreq else None,
+            "priority": None
+        }
+
+        if priority:
+            try:
+                url_data["priority"] = float(priority.strip())
+            except ValueError:
+                pass
+
+        return url_data
+
+    def _parse_sitemap_xml(self, sitemap_content: Union[str, bytes]) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """Stream-parse sitemap XML with lxml, returning (sub-sitemap URLs, URL entries)."""
+        if isinstance(sitemap_content, str):
+            sitemap_content = sitemap_content.encode('utf-8')
+
+        sitemap_urls = []
+        url_entries = []
+        root_locs = []
+
+        stream = io.BytesIO(sitemap_content)
+        if sitemap_content[:2] == _GZIP_MAGIC:
+            # Inflate while parsing so peak memory stays chunk-sized, not file-sized
+            stream = gzip.GzipFile(fileobj=stream)
+
+        for _, elem in etree.iterparse(stream, events=('end',),
+                                       tag=('{*}sitemap', '{*}url', '{*}loc')):
+            tag = etree.QName(elem).localname
+
+            if tag == 'loc':
+                # Locs inside <url>/<sitemap> are read when their parent closes;
+                # only keep the ones listed directly at the root level
+                parent = elem.getparent()
+                if parent is not None and etree.QName(parent).localname not in ('url', 'sitemap') and elem.text:
+                    root_locs.append(elem.text)
+                continue
+
+            loc = elem.findtext('{*}loc')
+            if loc and loc.strip():
+                if tag == 'sitemap':
+                    sitemap_urls.append(loc.strip())
+                else:
+                    url_entries.append(self._build_url_entry(
+                        loc,
+                        elem.findtext('{*}lastmod'),
+                        elem.findtext('{*}changefreq'),
+                        elem.findtext('{*}priority')
+                    ))
+
+            # Free processed elements so memory stays flat on huge sitemaps
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
+        if not sitemap_urls and not url_entries:
+            # Some sitemaps directly list locs at the root level
+            url_entries = [self._build_url_entry(loc) for loc in root_locs if loc.strip()]
+
+        return sitemap_urls, url_entries
+
+    def _parse_sitemap_soup(self, sitemap_content: Union[str, bytes]) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """Lenient BeautifulSoup fallback for sitemaps that are not well-formed XML."""
+        if isinstance(sitemap_content, bytes) and sitemap_content[:2] == _GZIP_MAGIC:
+            sitemap_content = gzip.decompress(sitemap_content)
+        soup = BeautifulSoup(sitemap_content, 'xml')
+
+        def text_of(parent, name: str) -> Optional[str]:
+            tag = parent.find(name)
+            return tag.string if tag and tag.string else None
+
+        # Check if this is a sitemap index
+        sitemaps = soup.find_all('sitemap')
+        if sitemaps:
+            sitemap_urls = [loc.strip() for loc in (text_of(sitemap, 'loc') for sitemap in sitemaps) if loc]
+            return sitemap_urls, []
+
+        urls = soup.find_all('url')
+        if not urls:
+            # Some sitemaps directly list locs at the root level
+            return [], [self._build_url_entry(loc.string) for loc in soup.find_all('loc') if loc.string]
+
+        url_entries = []
+        for url in urls:
+            loc = text_of(url, 'loc')
+            if loc:
+                url_entries.append(self._build_url_entry(
+                    loc,
+                    text_of(url, 'lastmod'),
+                    text_of(url, 'changefreq'),
+                    text_of(url, 'priority')
+                ))
+
+        return [], url_entries
+
+    async def parse_sitemap(self, sitemap_content: Union[str, bytes], session: aiohttp.ClientSession,
+                            on_url: Optional[UrlCallback] = None) -> List[Dict[str, Any]]:
+        """Parse the sitemap XML and extract URLs with metadata.
+
+        If ``on_url`` is given it is awaited with each URL entry as soon as its
+        sitemap has been parsed, before the rest of a sitemap index is done.
+        """
         if not sitemap_content:
             return []
 
         try:
-            soup = BeautifulSoup(sitemap_content, 'xml')
+            try:
+                sitemap_urls, url_entries = self._parse_sitemap_xml(sitemap_content)
+            except etree.XMLSyntaxError as e:
+                logger.warning(f"Sitemap is not well-formed XML, falling back to BeautifulSoup: {str(e)}")
+                sitemap_urls, url_entries = self._parse_sitemap_soup(sitemap_content)
 
             # Check if this is a sitemap index
-            sitemaps = soup.find_all('sitemap')
-            if sitemaps:
-                logger.info(f"Found sitemap index with {len(sitemaps)} sitemaps")
-                all_urls = []
-
-                for sitemap in sitemaps:
-                    loc_tag = sitemap.find('loc')
-                    if loc_tag and loc_tag.string:
-                        sitemap_url = loc_tag.string.strip()
-                        logger.info(f"Processing sub-sitemap: {sitemap_url}")
-
-                        sub_content = await self.fetch_url(sitemap_url, session)
-                        if sub_content:
-                            sub_urls = await self.parse_sitemap(sub_content, session)
-                            all_urls.extend(sub_urls)
-
-                return all_urls
-
-            # Handle regular sitemap
-            url_entries = []
-            urls = soup.find_all('url')
-
-            if not urls:
-                # Some sitemaps directly list locs at the root level
-                locs = soup.find_all('loc')
-                if locs:
-                    for loc in locs:
-                        if loc.string:
-                            url_entries.append({
-                                "url": loc.string.strip(),
-                                "lastmod": None,
-                                "changefreq": None,
-                                "priority": None
-                            })
-            else:
-                for url in urls:
-                    loc = url.find('loc')
-                    if loc and loc.string:
-                        url_data = {
-                            "url": loc.string.strip(),
-                            "lastmod": None,
-                            "changefreq": None,
-                            "priority": None
-                        }
-
-                        # Extract additional metadata
-                        lastmod = url.find('lastmod')
-                        if lastmod and lastmod.string:
-                            url_data["lastmod"] = lastmod.string.strip()
+            if sitemap_urls:
+                logger.info(f"Found sitemap index with {len(sitemap_urls)} sitemaps")
 
-                        changefreq = url.find('changefreq')
-                        if changefreq and changefreq.string:
-                            url_data["changefreq"] = changefreq.string.strip()
+                # Fetch and parse sub-sitemaps concurrently; fetch_bytes reserves each request its
+                # own per-domain slot, so a big index is paced by the crawl delay, not sent at once
+                sub_contents = await asyncio.gather(
+                    *(self.fetch_bytes(sitemap_url, session) for sitemap_url in sitemap_urls)
+                )
+                sub_results = await asyncio.gather(
+                    *(self.parse_sitemap(sub_content, session, on_url) for sub_content in sub_contents if sub_content)
+                )
 
-                        priority = url.find('priority')
-                        if priority and priority.string:
-                            try:
-                                url_data["priority"] = float(priority.string.strip())
-                            except ValueError:
-                                pass
+                return [url_data for sub_urls in sub_results for url_data in sub_urls]
 
-                        url_entries.append(url_data)
+            if on_url is not None:
+                for url_data in url_entries:
+                    await on_url(url_data)
 
             return url_entries
 
@@ -188,104 +309,166 @@ class EnhancedSitemapCrawler:
             logger.error(f"Error parsing sitemap: {str(e)}")
             return []
 
-    async def discover_urls_from_html(self, html_content: str, base_url: str) -> Set[str]:
-        """Extract URLs from HTML content for sites without sitemaps."""
-        if not html_content:
+    def _extract_links(self, html_content: str, base_url: str) -> Set[str]:
+        """Parse HTML with lxml and return same-domain absolute link URLs."""
+        try:
+            try:
+                root = lxml.html.fromstring(html_content)
+            except ValueError:
+                # lxml refuses str input that carries an XML encoding declaration
+                root = lxml.html.fromstring(html_content.encode('utf-8'))
+        except etree.ParserError:
+            # Document is empty (e.g. whitespace only)
             return set()
 
         discovered_urls = set()
 
-        try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            links = soup.find_all('a', href=True)
-
-            for link in links:
-                href = link['href'].strip()
+        for link in root.iter('a'):
+            href = (link.get('href') or '').strip()
 
-                # Skip empty links, anchors, javascript, mailto etc.
-                if not href or href.startswith('#') or href.startswith('javascript:') or href.startswith('mailto:'):
-                    continue
+            # Skip empty links, anchors, javascript, mailto etc.
+            if not href or href.startswith(_SKIP_PREFIXES):
+                continue
 
-                # Convert relative URLs to absolute
-                if not href.startswith(('http://', 'https://')):
-                    href = urljoin(base_url, href)
+            # Convert relative URLs to absolute
+            if not href.startswith(('http://', 'https://')):
+                href = urljoin(base_url, href)
 
-                # Only include URLs from the same domain
-                parsed_href = urlparse(href)
-                if parsed_href.netloc == self.domain:
-                    discovered_urls.add(href)
-
-        except Exception as e:
-            logger.error(f"Error extracting links from HTML: {str(e)}")
+            # Only include URLs from the same domain
+            if netloc(href) == self.domain:
+                discovered_urls.add(href)
 
         return discovered_urls
 
-    async def crawl_without_sitemap(self, session: aiohttp.ClientSession, max_pages: int = 100) -> List[Dict[str, Any]]:
-        """Crawl a website without a sitemap by following links."""
-        to_crawl = {self.base_url}
-        crawled = set()
-        results = []
+    async def discover_urls_from_html(self, html_content: str, base_url: str) -> Set[str]:
+        """Extract URLs from HTML content for sites without sitemaps."""
+        if not html_content:
+            return set()
 
-        while to_crawl and len(crawled) < max_pages:
-            current_url = to_crawl.pop()
+        try:
+            # Parse in a worker thread so large pages never stall the event loop
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._extract_links, html_content, base_url)
+        except Exception as e:
+            logger.error(f"Error extracting links from HTML: {str(e)}")
+            return set()
 
-            if current_url in crawled:
-                continue
+    async def crawl_without_sitemap(self, session: aiohttp.ClientSession, max_pages: int = 100,
+                                    on_url: Optional[UrlCallback] = None) -> List[Dict[str, Any]]:
+        """Crawl a website without a sitemap by following links with a pool of concurrent workers.
 
-            logger.info(f"Crawling {current_url}")
+        If ``on_url`` is given it is awaited with each page's entry as soon as the page is fetched.
+        """
+        if max_pages <= 0:
+            return []
 
-            # Check robots.txt
-            allowed, delay = await self.robots_parser.is_allowed(current_url)
-            if not allowed:
-                logger.warning(f"URL {current_url} is disallowed by robots.txt")
-                continue
+        # FIFO queue gives a breadth-first crawl; enqueued stops a URL being queued twice
+        queue: asyncio.Queue = asyncio.Queue()
+        queue.put_nowait(self.base_url)
+        enqueued = {self.base_url}
+        results = []
+        # robots.txt path checkers for this crawl, keyed by scheme://netloc
+        robots_matchers: Dict[str, Callable[[str], Tuple[bool, float]]] = {}
+        # Set by the first worker to fill the page budget; everyone else stops fetching
+        budget_spent = asyncio.Event()
+
+        async def worker() -> None:
+            while True:
+                current_url = await queue.get()
+                try:
+                    if budget_spent.is_set():
+                        # Page budget is spent; just drain the queue
+                        continue
+
+                    logger.info(f"Crawling {current_url}")
+
+                    # Check robots.txt
+                    parsed_url = urlparse(current_url)
+                    host = f"{parsed_url.scheme}://{parsed_url.netloc}"
+                    matcher = robots_matchers.get(host)
+                    if matcher is None:
+                        matcher = robots_matchers[host] = await self.robots_parser.get_host_matcher(host)
+                    allowed, delay = matcher(parsed_url.path or "/")
+                    # fetch_url paces requests to the domain by this from now on
+                    self.crawl_delays[parsed_url.netloc] = delay
+                    if not allowed:
+                        logger.warning(f"URL {current_url} is disallowed by robots.txt")
+                        continue
+
+                    # Another worker may have filled the budget while we awaited robots.txt
+                    if budget_spent.is_set():
+                        continue
+
+                    # Fetch page
+                    html_content = await self.fetch_url(current_url, session)
+                    if html_content and not budget_spent.is_set():
+                        # Add to results
+                        url_data = {
+                            "url": current_url,
+                            "lastmod": None,
+                            "changefreq": None,
+                            "priority": None
+                        }
+                        results.append(url_data)
+                        if len(results) >= max_pages:
+                            budget_spent.set()
+                        if on_url is not None:
+                            await on_url(url_data)
+                        if budget_spent.is_set():
+                            continue
+
+                        # Extract links for further crawling
+                        new_urls = await self.discover_urls_from_html(html_content, current_url)
+                        if not budget_spent.is_set():
+                            for url in new_urls - enqueued:
+                                enqueued.add(url)
+                                queue.put_nowait(url)
+                except Exception as e:
+                    logger.error(f"Error crawling {current_url}: {str(e)}")
+                finally:
+                    queue.task_done()
+
+        # fetch_url's semaphore still bounds how many requests are in flight
+        workers = [asyncio.create_task(worker()) for _ in range(self.max_concurrency)]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
 
-            # Fetch page
-            html_content = await self.fetch_url(current_url, session)
-            if html_content:
-                # Add to crawled list
-                crawled.add(current_url)
-
-                # Add to results
-                results.append({
-                    "url": current_url,
-                    "lastmod": None,
-                    "changefreq": None,
-                    "priority": None
-                })
-
-                # Extract links for further crawling
-                new_urls = await self.discover_urls_from_html(html_content, current_url)
-                for url in new_urls:
-                    if url not in crawled:
-                        to_crawl.add(url)
+        return results
 
-            # Apply rate limiting
-            await asyncio.sleep(delay)
+    async def crawl(self, max_pages: int = 500, on_url: Optional[UrlCallback] = None) -> List[Dict[str, Any]]:
+        """Crawl the website and return discovered URLs with metadata.
 
-        return results
+        Pass ``on_url`` to receive each URL entry as it is discovered, so
+        callers can start on pages while discovery is still running.
+        """
+        # Reuse one pooled session across crawl() calls so keep-alive connections survive
+        session = await self._get_session()
 
-    async def crawl(self, max_pages: int = 500) -> List[Dict[str, Any]]:
-        """Crawl the website and return discovered URLs with metadata."""
-        async with aiohttp.ClientSession() as session:
-            # Try to find and use sitemap
-            sitemap_url = await self.discover_sitemap_url(session)
+        # Try to find and use sitemap
+        sitemap_url = await self.discover_sitemap_url(session)
 
-            if sitemap_url:
-                logger.info(f"Using sitemap at {sitemap_url}")
-                sitemap_content = await self.fetch_url(sitemap_url, session)
-                if sitemap_content:
-                    return await self.parse_sitemap(sitemap_content, session)
+        if sitemap_url:
+            logger.info(f"Using sitemap at {sitemap_url}")
+            sitemap_content = await self.fetch_bytes(sitemap_url, session)
+            if sitemap_content:
+                return await self.parse_sitemap(sitemap_content, session, on_url)
 
-            # If no sitemap found or sitemap processing failed, fall back to HTML crawling
-            logger.info(f"No sitemap found for {self.base_url}, falling back to HTML crawling")
-            return await self.crawl_without_sitemap(session, max_pages)
+        # If no sitemap found or sitemap processing failed, fall back to HTML crawling
+        logger.info(f"No sitemap found for {self.base_url}, falling back to HTML crawling")
+        return await self.crawl_without_sitemap(session, max_pages, on_url)
 
 
 # Example usage
 async def main():
     crawler = EnhancedSitemapCrawler("https://example.com")
-    urls = await crawler.crawl()
+    try:
+        urls = await crawler.crawl()
+    finally:
+        await crawler.close()
     print(f"Discovered {len(urls)} URLs:")
     for url_data in urls[:10]:  # Print first 10 URLs
         print(f"- {url_data['url']} (lastmod: {url_data['lastmod']})")
@@ -1,829 +1,609 @@
 import logging
 import asyncio
-from typing import Dict, Any, List, Optional, Union
+import hashlib
+import sys
+from collections import Counter, deque
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Union, Iterator, Tuple, Callable
 from abc import ABC, abstractmethod
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
 import aiohttp
 import re
-from urllib.parse import urlparse, urljoin
+from urllib.parse import urlparse, urljoin, urlsplit
 
-logger = logging.getLogger(__name__)
-
-
-class DomainCrawler(ABC):
-    """Base class for domain-specific crawlers."""
-
-    def __init__(self, base_url: str, user_agent: str = "RAGCrawler"):
-        self.base_url = base_url.rstrip('/')
-        self.domain = urlparse(base_url).netloc
-        self.user_agent = user_agent
-        self.headers = {
-            "User-Agent": f"{user_agent}/1.0",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Connection": "keep-alive"
-        }
-
-    @abstractmethod
-    async def extract_content(self, html: str, url: str) -> Dict[str, Any]:
-        """Extract domain-specific content from HTML."""
-        pass
-
-    @abstractmethod
-    async def discover_urls(self, html: str, url: str) -> List[str]:
-        """Discover domain-specific URLs from HTML."""
-        pass
-
-    async def fetch_url(self, url: str, session: aiohttp.ClientSession) -> Optional[str]:
-        """Fetch the content of a URL."""
-        try:
-            async with session.get(url, headers=self.headers) as response:
-                if response.status == 200:
-                    return await response.text()
-                else:
-                    logger.warning(f"Failed to fetch {url}: HTTP {response.status}")
-                    return None
-        except Exception as e:
-            logger.error(f"Error fetching {url}: {str(e)}")
-            return None
-
-
-class BlogCrawler(DomainCrawler):
-    """Crawler optimized for blog websites."""
-
-    async def extract_content(self, html: str, url: str) -> Dict[str, Any]:
-        """Extract blog-specific content from HTML."""
-        if not html:
-            return {"url": url, "error": "No HTML content"}
-
-        try:
-            soup = BeautifulSoup(html, 'lxml')
-
-            # Extract title
-            title = ""
-            title_tag = soup.find('title')
-            if title_tag:
-                title = title_tag.text.strip()
-
-            # Try to find blog post content using common patterns
-            content_selectors = [
-                'article',
-                '.post-content',
-                '.entry-content',
-                '.blog-post',
-                '.article-content',
-                '#content',
-                '.content',
-                'main'
-            ]
-
-            content_element = None
-            for selector in content_selectors:
-                # Try CSS selector
-                element = soup.select_one(selector)
-                if element:
-                    content_element = element
-                    break
-
-                # Try HTML tag
-                if selector.startswith('.') or selector.startswith('#'):
-                    continue
-                element = soup.find(selector)
-                if element:
-                    content_element = element
-                    break
-
-            # Extract text from content element or fallback to body
-            if content_element:
-                paragraphs = content_element.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'li'])
-            else:
-                paragraphs = soup.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
-
-            # Extract text content
-            content_parts = []
-            for p in paragraphs:
-                text = p.get_text().strip()
-                if text and len(text) > 10:  # Skip very short paragraphs
-                    content_parts.append(text)
-
-            content = "\n\n".join(content_parts)
+from crawler.utils.helpers import PARSER_OPTIONS, browser_headers, create_session, parse_document
+from crawler.utils.process_pool import PROCESS_POOL_ENABLED, run_in_process_pool
 
-            # Extract metadata
-            metadata = {}
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # Optional; link discovery falls back to lxml
+    LexborHTMLParser = None
 
-            # Published date
-            date_selectors = [
-                'time',
-                '.post-date',
-                '.entry-date',
-                '.published',
-                'meta[property="article:published_time"]',
-                'meta[property="og:published_time"]'
-            ]
-
-            for selector in date_selectors:
-                if selector.startswith('meta'):
-                    element = soup.select_one(selector)
-                    if element and element.get('content'):
-                        metadata['published_date'] = element['content']
-                        break
-                else:
-                    element = soup.select_one(selector)
-                    if element:
-                        if element.get('datetime'):
-                            metadata['published_date'] = element['datetime']
-                            break
-                        elif element.text.strip():
-                            metadata['published_date'] = element.text.strip()
-                            break
+logger = logging.getLogger(__name__)
 
-            # Author
-            author_selectors = [
-                '.author',
-                '.byline',
-                'meta[name="author"]',
-                'meta[property="article:author"]',
-                'a[rel="author"]'
-            ]
-
-            for selector in author_selectors:
-                if selector.startswith('meta'):
-                    element = soup.select_one(selector)
-                    if element and element.get('content'):
-                        metadata['author'] = element['content']
-                        break
-                else:
-                    element = soup.select_one(selector)
-                    if element:
-                        metadata['author'] = element.text.strip()
-                        break
+# Per worker process: a crawler per (class, site)
+@lru_cache(maxsize=32)
+def _worker_crawler(crawler_cls: type, base_url: str, user_agent: str) -> 'DomainCrawler':
+    return crawler_cls(base_url, user_agent)
 
-            # Categories/Tags
-            tags = []
-            tag_selectors = [
-                '.tags a',
-                '.categories a',
-                '.post-tags a',
-                'meta[property="article:tag"]'
-            ]
-
-            for selector in tag_selectors:
-                if selector.startswith('meta'):
-                    elements = soup.select(selector)
-                    for element in elements:
-                        if element.get('content'):
-                            tags.append(element['content'])
-                else:
-                    elements = soup.select(selector)
-                    for element in elements:
-                        tag_text = element.text.strip()
-                        if tag_text:
-                            tags.append(tag_text)
 
-            if tags:
-                metadata['tags'] = list(set(tags))  # Remove duplicates
+def _process_page(crawler_cls: type, base_url: str, user_agent: str,
+                  html: str, url: str) -> Tuple[Dict[str, Any], List[str], Optional[Tuple[int, int]]]:
+    """Process-pool entry point: parse a page, extract its content, discover its URLs
+    and fingerprint its text."""
+    crawler = _worker_crawler(crawler_cls, base_url, user_agent)
+    return crawler._parse_and_extract(html, url)
 
-            return {
-                "url": url,
-                "title": title,
-                "content": content,
-                "metadata": metadata,
-                "content_type": "blog"
-            }
 
-        except Exception as e:
-            logger.error(f"Error extracting blog content from {url}: {str(e)}")
-            return {"url": url, "error": f"Error extracting content: {str(e)}"}
+# Bytes read from the response per step of DomainCrawler.fetch_tree's incremental parse
+_FEED_CHUNK_SIZE = 64 * 1024
 
-    async def discover_urls(self, html: str, url: str) -> List[str]:
-        """Discover blog-specific URLs from HTML."""
-        if not html:
-            return []
 
-        discovered_urls = set()
+# How far into a page DomainCrawler.fetch_url looks for a <meta> charset declaration,
+# covering both <meta charset="..."> and the http-equiv Content-Type form
+_META_SNIFF_BYTES = 4096
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([a-zA-Z0-9_.:-]+)', re.IGNORECASE)
 
-        try:
-            soup = BeautifulSoup(html, 'lxml')
-
-            # Find all links
-            links = soup.find_all('a', href=True)
 
-            for link in links:
-                href = link['href'].strip()
+# Link prefixes that never point at crawlable pages
+_SKIP_PREFIXES = ('#', 'javascript:', 'mailto:', 'tel:', 'data:', 'ftp:')
 
-                # Skip empty links, anchors, javascript, mailto etc.
-                if not href or href.startswith('#') or href.startswith('javascript:') or href.startswith('mailto:'):
-                    continue
 
-                # Convert relative URLs to absolute
-                if not href.startswith(('http://', 'https://')):
-                    href = urljoin(url, href)
-
-                # Only include URLs from the same domain
-                parsed_href = urlparse(href)
-                if parsed_href.netloc == self.domain:
-                    # Look for blog-specific patterns
-                    blog_patterns = [
-                        r'/blog/',
-                        r'/post/',
-                        r'/article/',
-                        r'/\d{4}/\d{2}/',  # Date-based archives
-                        r'/category/',
-                        r'/tag/'
-                    ]
-
-                    for pattern in blog_patterns:
-                        if re.search(pattern, href):
-                            discovered_urls.add(href)
-                            break
-
-                    # Also check for links in blog index pages
-                    if link.parent and (
-                            'post' in link.parent.get('class', []) or
-                            'blog' in link.parent.get('class', []) or
-                            'article' in link.parent.get('class', [])
-                    ):
-                        discovered_urls.add(href)
+# An href that carries its own scheme (e.g. "HTTP://", "ftp:")
+_SCHEME_RE = re.compile(r'[a-zA-Z][a-zA-Z0-9+.-]*:')
 
-            return list(discovered_urls)
 
-        except Exception as e:
-            logger.error(f"Error discovering blog URLs from {url}: {str(e)}")
-            return []
+def _link_resolver(base_url: str) -> Callable[[str], str]:
+    """Return a function that resolves relative hrefs against base_url.
 
+    base_url is split once up front, so the usual href forms ("/path", "//host/path",
+    "page.html") are resolved by string concatenation instead of a full urljoin per
+    link. Anything with dot segments, a query-only href or its own scheme still goes
+    through urljoin.
+    """
+    parts = urlsplit(base_url)
+    scheme = parts.scheme
+    origin = f"{scheme}://{parts.netloc}"
+    base_dir = origin + parts.path.rsplit('/', 1)[0] + '/'
 
-class DocumentationCrawler(DomainCrawler):
-    """Crawler optimized for documentation websites."""
+    def resolve(href: str) -> str:
+        match = _SCHEME_RE.match(href)
+        if match:
+            # Schemes are case-insensitive; lowercase them so "HTTP://" links pass the domain check
+            return urljoin(base_url, href[:match.end()].lower() + href[match.end():])
+        if href.startswith('.') or '/.' in href or href.startswith('?'):
+            return urljoin(base_url, href)
+        if href.startswith('//'):
+            return f"{scheme}:{href}"
+        if href.startswith('/'):
+            return origin + href
+        return base_dir + href
 
-    async def extract_content(self, html: str, url: str) -> Dict[str, Any]:
-        """Extract documentation-specific content from HTML."""
-        if not html:
-            return {"url": url, "error": "No HTML content"}
+    return resolve
 
-        try:
-            soup = BeautifulSoup(html, 'lxml')
 
-            # Extract title
-            title = ""
-            title_tag = soup.find('title')
-            if title_tag:
-                title = title_tag.text.strip()
+# Pages with fewer words of extracted text than this only count as duplicates of pages
+# with exactly the same fingerprint; a few shared words say little about short pages
+_SIMHASH_MIN_TOKENS = 50
 
-            # Try to find documentation content using common patterns
-            content_selectors = [
-                '.documentation',
-                '.docs',
-                '.doc-content',
-                '.markdown-body',
-                '.content',
-                'article',
-                'main'
-            ]
-
-            content_element = None
-            for selector in content_selectors:
-                # Try CSS selector
-                element = soup.select_one(selector)
-                if element:
-                    content_element = element
-                    break
 
-                # Try HTML tag
-                if selector.startswith('.') or selector.startswith('#'):
-                    continue
-                element = soup.find(selector)
-                if element:
-                    content_element = element
-                    break
+@lru_cache(maxsize=65536)
+def _token_hash(token: str) -> int:
+    # Not hash(): fingerprints come from worker processes, each with its own hash seed
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
 
-            # Extract structured content
-            structured_content = {}
 
-            # Extract headings
-            headings = []
-            if content_element:
-                for level in range(1, 7):
-                    for heading in content_element.find_all(f'h{level}'):
-                        headings.append({
-                            "level": level,
-                            "text": heading.get_text().strip(),
-                            "id": heading.get('id', '')
-                        })
+def _simhash(tokens: List[str]) -> int:
+    """64-bit SimHash of a token list; near-identical token lists differ in few bits."""
+    weights = [0] * 64
+    for token, count in Counter(tokens).items():
+        token_hash = _token_hash(token)
+        for bit in range(64):
+            if token_hash >> bit & 1:
+                weights[bit] += count
             else:
-                for level in range(1, 7):
-                    for heading in soup.find_all(f'h{level}'):
-                        headings.append({
-                            "level": level,
-                            "text": heading.get_text().strip(),
-                            "id": heading.get('id', '')
-                        })
-
-            structured_content['headings'] = headings
+                weights[bit] -= count
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def _text_fingerprint(content: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+    """SimHash and word count of a page's extracted main text, or None if it has none.
+
+    Only the text extract_content kept is fingerprinted, with its digits, so pages that
+    share a site template but differ in their content do not look alike.
+    """
+    text = content.get('content')
+    if not text or not isinstance(text, str):
+        return None
+    tokens = text.split()
+    return _simhash(tokens), len(tokens)
+
+
+def _has_class(name: str) -> str:
+    """XPath predicate for elements carrying a CSS class, i.e. the '.name' part of a selector."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _class_xpath(name: str) -> str:
+    """XPath for descendants carrying a CSS class, i.e. the selector '.name'."""
+    return f'.//*[{_has_class(name)}]'
+
+
+def _meta(attribute: str, value: str) -> str:
+    return f'meta[@{attribute}="{value}"]'
+
+
+def _step(selector: str) -> str:
+    """Translate a simple selector ('tag', '.class', '#id', 'tag.class' or an XPath step) to an XPath step."""
+    if selector[0] == '#':
+        return f'*[@id="{selector[1:]}"]'
+    if selector[0] == '[':
+        return f'*{selector}'
+    tag, dot, name = selector.partition('.')
+    if dot and '[' not in selector:
+        return f'{tag or "*"}[{_has_class(name)}]'
+    return selector
+
+
+class _PrioritySelector:
+    """Selectors in priority order, matched with a single XPath query.
+
+    Trying each selector with its own (.//step)[1] query walks the whole tree for every
+    selector that has no match. Instead, all of them are unioned into one XPath, with
+    the class selectors folded into a single step over elements that have a class
+    attribute, and matches are ranked by the first selector they satisfy.
+    """
+
+    def __init__(self, *selectors: str):
+        steps = [_step(selector) for selector in selectors]
+        self.tests = tuple(etree.XPath(f'boolean(self::{step})') for step in steps)
+
+        if len(steps) == 1:
+            self.grouped = etree.XPath(f'(.//{steps[0]})[1]')
+        else:
+            parts = [f'.//{step}' for selector, step in zip(selectors, steps) if selector[0] != '.']
+            classes = [_has_class(selector[1:]) for selector in selectors if selector[0] == '.']
+            if classes:
+                parts.append(f".//*[@class][{' or '.join(classes)}]")
+            self.grouped = etree.XPath(' | '.join(parts))
+
+    def select_one(self, root) -> Optional[lxml.html.HtmlElement]:
+        """Return the first match of the highest-priority selector that matches anything."""
+        best, best_rank = None, len(self.tests)
+        for element in self.grouped(root):
+            rank = next(i for i, test in enumerate(self.tests) if test(element))
+            if rank < best_rank:
+                best, best_rank = element, rank
+                if rank == 0:
+                    # Nothing can outrank the top selector
+                    break
+        return best
 
-            # Extract paragraphs and code blocks
-            paragraphs = []
-            code_blocks = []
 
-            if content_element:
-                # Extract paragraphs
-                for p in content_element.find_all('p'):
-                    text = p.get_text().strip()
-                    if text:
-                        paragraphs.append(text)
+def _text(element) -> str:
+    return element.text_content().strip()
 
-                # Extract code blocks
-                for code in content_element.find_all(['pre', 'code']):
-                    # Skip if it's a 'code' inside a 'pre' to avoid duplication
-                    if code.name == 'code' and code.parent.name == 'pre':
-                        continue
 
-                    code_text = code.get_text().strip()
-                    if code_text:
-                        language = ''
-                        if code.get('class'):
-                            for cls in code.get('class'):
-                                if cls.startswith('language-') or cls.startswith('lang-'):
-                                    language = cls.split('-')[1]
-                                    break
+def _content(element) -> Optional[str]:
+    # <meta> tags carry their value in the content attribute
+    return element.get('content')
 
-                        code_blocks.append({
-                            "code": code_text,
-                            "language": language
-                        })
-            else:
-                # Extract paragraphs
-                for p in soup.find_all('p'):
-                    text = p.get_text().strip()
-                    if text:
-                        paragraphs.append(text)
 
-                # Extract code blocks
-                for code in soup.find_all(['pre', 'code']):
-                    # Skip if it's a 'code' inside a 'pre' to avoid duplication
-                    if code.name == 'code' and code.parent.name == 'pre':
-                        continue
+def _datetime_or_text(element) -> str:
+    return element.get('datetime') or element.text_content().strip()
 
-                    code_text = code.get_text().strip()
-                    if code_text:
-                        language = ''
-                        if code.get('class'):
-                            for cls in code.get('class'):
-                                if cls.startswith('language-') or cls.startswith('lang-'):
-                                    language = cls.split('-')[1]
-                                    break
 
-                        code_blocks.append({
-                            "code": code_text,
-                            "language": language
-                        })
+def _extractors(getter: Callable, *selectors: str) -> tuple:
+    """Pair each selector with the getter that reads a value from its first match."""
+    return tuple((_PrioritySelector(selector), getter) for selector in selectors)
 
-            structured_content['paragraphs'] = paragraphs
-            structured_content['code_blocks'] = code_blocks
 
-            # Combine content into a single text
-            text_parts = []
+def _first_value(root, extractors) -> Optional[str]:
+    """Return the first non-empty value found by an extractor table, in table order."""
+    for selector, getter in extractors:
+        element = selector.select_one(root)
+        if element is not None:
+            value = getter(element)
+            if value:
+                return value
+    return None
 
-            # Add headings
-            for heading in headings:
-                text_parts.append(f"{'#' * heading['level']} {heading['text']}")
 
-            # Add paragraphs
-            for paragraph in paragraphs:
-                text_parts.append(paragraph)
+def _all_values(root, extractors) -> Iterator[str]:
+    """Yield every non-empty value found by an extractor table of XPaths, in table order."""
+    for xpath, getter in extractors:
+        for element in xpath(root):
+            value = getter(element)
+            if value:
+                yield value
+
+
+# Smart strings would keep a reference from every href back to its element
+_HREF_XPATH = etree.XPath('.//a/@href', smart_strings=False)
+
+
+@lru_cache(maxsize=None)
+def _parent_links_xpath(parent_classes: frozenset) -> etree.XPath:
+    """XPath for the hrefs of links directly inside an element with one of the classes."""
+    classes = ' or '.join(_has_class(name) for name in sorted(parent_classes))
+    return etree.XPath(f'.//*[@class][{classes}]/a/@href', smart_strings=False)
+
+
+@lru_cache(maxsize=None)
+def _parent_links_css(parent_classes: frozenset) -> str:
+    """CSS selector for links directly inside an element with one of the classes."""
+    return ', '.join(f'.{name} > a[href]' for name in sorted(parent_classes))
+
+
+# The domain crawlers work on the lxml tree with compiled XPath rather than BeautifulSoup
+
+# Blog-specific URL patterns, including date-based archives, as one alternation
+_BLOG_URL_RE = re.compile(r'/blog/|/post/|/article/|/\d{4}/\d{2}/|/category/|/tag/')
+
+# Links directly inside elements with these classes are followed whatever their URL
+_BLOG_LINK_PARENT_CLASSES = frozenset(('post', 'blog', 'article'))
+
+# Selector lists and extractor tables are in priority order
+_BLOG_CONTENT_SELECTOR = _PrioritySelector(
+    'article', '.post-content', '.entry-content', '.blog-post', '.article-content', '#content', '.content', 'main'
+)
+_BLOG_DATE_EXTRACTORS = (
+    _extractors(_datetime_or_text, 'time', '.post-date', '.entry-date', '.published') +
+    _extractors(_content, _meta('property', 'article:published_time'), _meta('property', 'og:published_time'))
+)
+_BLOG_AUTHOR_EXTRACTORS = (
+    ((_PrioritySelector('.author', '.byline'), _text),) +
+    _extractors(_content, _meta('name', 'author'), _meta('property', 'article:author')) +
+    _extractors(_text, 'a[@rel="author"]')
+)
+_BLOG_TAG_EXTRACTORS = (
+    (etree.XPath(f"{_class_xpath('tags')}//a"), _text),
+    (etree.XPath(f"{_class_xpath('categories')}//a"), _text),
+    (etree.XPath(f"{_class_xpath('post-tags')}//a"), _text),
+    (etree.XPath(f".//{_meta('property', 'article:tag')}"), _content),
+)
+
+
+# Documentation-specific URL patterns
+_DOC_URL_RE = re.compile(r'/docs/|/documentation/|/guide/|/tutorial/|/manual/|/reference/|/api/')
+
+# The language of a code block, from a "language-xxx" or "lang-xxx" class
+_LANG_CLASS_RE = re.compile(r'(?:^|\s)(?:language|lang)-(\S*)')
+
+_DOC_LINK_PARENT_CLASSES = frozenset(('nav', 'sidebar', 'toc', 'menu'))
+
+_DOC_CONTENT_SELECTOR = _PrioritySelector(
+    '.documentation', '.docs', '.doc-content', '.markdown-body', '.content', 'article', 'main'
+)
+# Headings, paragraphs and code blocks in document order; code inside <pre> is part of the pre
+_DOC_NODES_XPATH = etree.XPath(
+    './/h1 | .//h2 | .//h3 | .//h4 | .//h5 | .//h6 | .//p | .//pre | .//code[not(parent::pre)]'
+)
+_DOC_VERSION_XPATHS = (
+    etree.XPath(f"({_class_xpath('version')})[1]"),
+    etree.XPath(f"({_class_xpath('doc-version')})[1]"),
+    etree.XPath(f".//{_meta('name', 'version')}/@content"),
+)
+
+
+# E-commerce-specific URL patterns
+_ECOM_URL_RE = re.compile(
+    r'/product/|/products/|/category/|/categories/|/catalog/|/shop/|/item/|/collection/'
+)
+
+_ECOM_LINK_PARENT_CLASSES = frozenset(('product', 'item', 'product-card'))
+
+# Any match marks a product page, so the indicators are grouped into one test
+_PRODUCT_INDICATOR = etree.XPath(
+    'boolean(.//meta[@property="og:type"][@content="product"] | '
+    f"{_class_xpath('product')} | .//*[@id=\"product\"] | .//form[contains(@action, \"cart\")] | "
+    './/button[contains(@name, "add")] | .//input[contains(@name, "add_to_cart")])'
+)
+_PRODUCT_NAME_SELECTOR = _PrioritySelector('h1.product-title', '.product-name', '.product-title', 'h1')
+_PRODUCT_PRICE_EXTRACTORS = (
+    ((_PrioritySelector('.price', '.product-price', 'span[@itemprop="price"]'), _text),) +
+    _extractors(_content, _meta('property', 'product:price:amount'))
+)
+_PRODUCT_DESCRIPTION_EXTRACTORS = (
+    ((_PrioritySelector('.product-description', '.description', '[@itemprop="description"]'), _text),) +
+    _extractors(_content, _meta('property', 'og:description'))
+)
+_PRODUCT_IMAGE_META_SELECTOR = _PrioritySelector(_meta('property', 'og:image'))
+_PRODUCT_IMAGE_XPATHS = (
+    etree.XPath('.//*[@itemprop="image"]'),
+    etree.XPath(f"{_class_xpath('product-image')}//img"),
+    etree.XPath(f"{_class_xpath('product')}//img"),
+)
+_PRODUCT_SKU_EXTRACTORS = (
+    (_PrioritySelector('[@itemprop="sku"]', '.sku'), _text),
+    (_PrioritySelector('[@data-product-id]'), lambda element: element.get('data-product-id')),
+)
+
+_SHOP_CONTENT_SELECTOR = _PrioritySelector('.page-content', '.content', 'main', '#content')
+_CATEGORY_INDICATOR = etree.XPath(
+    f"boolean({_class_xpath('products')} | {_class_xpath('product-list')} | "
+    f"{_class_xpath('category')} | {_class_xpath('collection')})"
+)
+# One union returns each product element once, in document order
+_CATEGORY_PRODUCT_XPATH = etree.XPath(
+    f"{_class_xpath('product')} | {_class_xpath('product-item')} | "
+    f"{_class_xpath('product-card')} | {_class_xpath('collection-item')}"
+)
+_CATEGORY_ITEM_NAME_SELECTOR = _PrioritySelector('h3', 'h2', '.name')
+_CATEGORY_ITEM_LINK_SELECTOR = _PrioritySelector('a')
+_CATEGORY_ITEM_PRICE_SELECTOR = _PrioritySelector('.price')
+
+# Text-bearing elements, for page content outside the structured extraction
+_BLOG_TEXT_TAGS = ('p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'li')
+_PAGE_TEXT_TAGS = ('p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+
+def _no_html(html: Union[str, lxml.html.HtmlElement, None]) -> bool:
+    # An lxml element's truth value is its child count, so only test strings for emptiness
+    return html is None or not isinstance(html, lxml.html.HtmlElement) and not html
+
 
-            # Add code blocks
-            for code_block in code_blocks:
-                language = code_block['language']
-                language_str = f"```{language}\n" if language else "```\n"
-                text_parts.append(f"{language_str}{code_block['code']}\n```")
+class DomainCrawler(ABC):
+    """Base class for domain-specific crawlers."""
 
-            combined_text = "\n\n".join(text_parts)
+    def __init__(self, base_url: str, user_agent: str = "RAGCrawler"):
+        self.base_url = base_url.rstrip('/')
+        self.domain = urlparse(base_url).netloc
+        # Absolute URLs on this domain are the bare roots or start with one of the prefixes,
+        # so discovered links can be checked without parsing them
+        self._domain_roots = (f'http://{self.domain}', f'https://{self.domain}')
+        self._domain_prefixes = tuple(root + end for root in self._domain_roots for end in ('/', '?', '#'))
+        self.user_agent = user_agent
+        self.headers = browser_headers(user_agent)
+        self.max_concurrency = 10  # Upper bound on in-flight requests, for politeness
+        self._fetch_semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Pages whose text SimHash is within this many bits of a recent page are dropped by process()
+        self.near_duplicate_distance = 3
+        self._seen_hashes = deque(maxlen=1024)
+        # Whether process() parses pages in the shared process pool (crawler.utils.process_pool)
+        # rather than a thread
+        self.use_process_pool = PROCESS_POOL_ENABLED
+
+    def make_session(self, host_concurrency: Optional[int] = None, total: int = 100) -> aiohttp.ClientSession:
+        """Create an HTTP session with a pooled keep-alive connector and this crawler's headers.
+
+        host_concurrency caps connections per host and defaults to max_concurrency; total
+        caps them overall. Pass the session to fetch_url or fetch_tree to share one
+        connection pool between crawlers.
+        """
+        return create_session(limit=total, limit_per_host=host_concurrency or self.max_concurrency,
+                              headers=self.headers)
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared HTTP session, creating it with make_session on first use."""
+        if self._session is None or self._session.closed:
+            self._session = self.make_session()
+        return self._session
+
+    async def close(self) -> None:
+        """Close the HTTP session created by this crawler, if any."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def extract_content(self, html: Union[str, lxml.html.HtmlElement], url: str) -> Dict[str, Any]:
+        """Extract domain-specific content from HTML or an already parsed lxml tree, in a thread."""
+        return await asyncio.to_thread(self._extract_content_sync, html, url)
+
+    async def discover_urls(self, html: Union[str, lxml.html.HtmlElement], url: str) -> List[str]:
+        """Discover domain-specific URLs from HTML or an already parsed lxml tree, in a thread."""
+        return await asyncio.to_thread(self._discover_urls_sync, html, url)
 
-            # Extract metadata
-            metadata = {}
+    @abstractmethod
+    def _extract_content_sync(self, html: Union[str, lxml.html.HtmlElement], url: str) -> Dict[str, Any]:
+        """Extract domain-specific content; CPU-bound, so callers keep it off the event loop."""
+        pass
 
-            # Try to find documentation version
-            version_selectors = [
-                '.version',
-                '.doc-version',
-                'meta[name="version"]'
-            ]
-
-            for selector in version_selectors:
-                if selector.startswith('meta'):
-                    element = soup.select_one(selector)
-                    if element and element.get('content'):
-                        metadata['version'] = element['content']
-                        break
-                else:
-                    element = soup.select_one(selector)
-                    if element:
-                        metadata['version'] = element.text.strip()
-                        break
+    @abstractmethod
+    def _discover_urls_sync(self, html: Union[str, lxml.html.HtmlElement], url: str) -> List[str]:
+        """Discover domain-specific URLs; CPU-bound, so callers keep it off the event loop."""
+        pass
 
-            return {
-                "url": url,
-                "title": title,
-                "content": combined_text,
-                "structured_content": structured_content,
-                "metadata": metadata,
-                "content_type": "documentation"
-            }
+    async def parse(self, html: str) -> Optional[lxml.html.HtmlElement]:
+        """Parse a page, in a thread, into the lxml tree that extract_content and discover_urls accept.
 
-        except Exception as e:
-            logger.error(f"Error extracting documentation content from {url}: {str(e)}")
-            return {"url": url, "error": f"Error extracting content: {str(e)}"}
+        Callers that need both should parse once and pass the tree to each, or use process().
+        Returns None if there is no document to parse.
+        """
+        return await asyncio.to_thread(parse_document, html)
 
-    async def discover_urls(self, html: str, url: str) -> List[str]:
-        """Discover documentation-specific URLs from HTML."""
+    async def process(self, html: str, url: str) -> Tuple[Dict[str, Any], List[str]]:
+        """Extract content and discover URLs from a page, parsing the HTML only once."""
         if not html:
+            return await self.extract_content(html, url), []
+
+        result = None
+        if self.use_process_pool:
+            try:
+                result = await run_in_process_pool(
+                    _process_page, type(self), self.base_url, self.user_agent, html, url
+                )
+            except asyncio.TimeoutError:
+                logger.error(f"Timed out processing {url}")
+                return {"url": url, "error": "Timed out processing page"}, []
+            except Exception as e:
+                # E.g. a broken pool, or no child processes allowed in this environment
+                logger.warning(f"Process pool unavailable, parsing in-process instead: {str(e)}")
+                self.use_process_pool = False
+
+        if result is None:
+            # Without worker processes, still keep the CPU-bound parsing off the event loop's thread
+            result = await asyncio.to_thread(self._parse_and_extract, html, url)
+
+        content, urls, fingerprint = result
+        if fingerprint is not None and self._is_near_duplicate(*fingerprint):
+            logger.info(f"Skipping near-duplicate page {url}")
+            return {"url": url, "error": "Near-duplicate of a previously processed page"}, []
+        return content, urls
+
+    def _parse_and_extract(self, html: str,
+                           url: str) -> Tuple[Dict[str, Any], List[str], Optional[Tuple[int, int]]]:
+        """Parse a page once, then extract its content, discover its URLs and fingerprint
+        its text; runs in a worker thread or process."""
+        tree = parse_document(html)
+        content = self._extract_content_sync(tree, url)
+        return content, self._discover_urls_sync(tree, url), _text_fingerprint(content)
+
+    def _discover_urls_impl(self, html: Union[str, lxml.html.HtmlElement], url: str, url_pattern: re.Pattern,
+                            parent_classes: frozenset, site_type: str) -> List[str]:
+        """Shared body of the discover_urls implementations.
+
+        Returns the same-domain links whose URL matches url_pattern, plus every same-domain
+        link directly inside an element with one of parent_classes.
+        """
+        if _no_html(html):
             return []
 
-        discovered_urls = set()
-
         try:
-            soup = BeautifulSoup(html, 'lxml')
-
-            # Find all links
-            links = soup.find_all('a', href=True)
-
-            for link in links:
-                href = link['href'].strip()
-
-                # Skip empty links, anchors, javascript, mailto etc.
-                if not href or href.startswith('#') or href.startswith('javascript:') or href.startswith('mailto:'):
-                    continue
+            hrefs, parent_hrefs = self._scan_links(html, parent_classes)
 
-                # Convert relative URLs to absolute
-                if not href.startswith(('http://', 'https://')):
-                    href = urljoin(url, href)
-
-                # Only include URLs from the same domain
-                parsed_href = urlparse(href)
-                if parsed_href.netloc == self.domain:
-                    # Look for documentation-specific patterns
-                    doc_patterns = [
-                        r'/docs/',
-                        r'/documentation/',
-                        r'/guide/',
-                        r'/tutorial/',
-                        r'/manual/',
-                        r'/reference/',
-                        r'/api/'
-                    ]
-
-                    for pattern in doc_patterns:
-                        if re.search(pattern, href):
-                            discovered_urls.add(href)
-                            break
-
-                    # Also check for links in navigation elements
-                    if link.parent and any(
-                            cls in link.parent.get('class', []) for cls in ['nav', 'sidebar', 'toc', 'menu']):
-                        discovered_urls.add(href)
+            discovered_urls = set(filter(url_pattern.search, self._same_domain_links(hrefs, url)))
+            discovered_urls.update(self._same_domain_links(parent_hrefs, url))
 
             return list(discovered_urls)
 
         except Exception as e:
-            logger.error(f"Error discovering documentation URLs from {url}: {str(e)}")
+            logger.error(f"Error discovering {site_type} URLs from {url}: {str(e)}")
             return []
 
-
-class EcommerceCrawler(DomainCrawler):
-    """Crawler optimized for e-commerce websites."""
-
-    async def extract_content(self, html: str, url: str) -> Dict[str, Any]:
-        """Extract e-commerce-specific content from HTML."""
-        if not html:
-            return {"url": url, "error": "No HTML content"}
-
-        try:
-            soup = BeautifulSoup(html, 'lxml')
-
-            # Extract title
-            title = ""
-            title_tag = soup.find('title')
-            if title_tag:
-                title = title_tag.text.strip()
-
-            # Check if this is a product page
-            is_product_page = False
-            product_indicators = [
-                'meta[property="og:type"][content="product"]',
-                '.product',
-                '#product',
-                'form[action*="cart"]',
-                'button[name*="add"]',
-                'input[name*="add_to_cart"]'
-            ]
-
-            for indicator in product_indicators:
-                if soup.select_one(indicator):
-                    is_product_page = True
-                    break
-
-            if is_product_page:
-                # Extract product information
-                product_info = {}
-
-                # Product name
-                product_name_selectors = [
-                    'h1.product-title',
-                    '.product-name',
-                    '.product-title',
-                    'h1',
-                ]
-
-                for selector in product_name_selectors:
-                    element = soup.select_one(selector)
-                    if element:
-                        product_info['name'] = element.text.strip()
-                        break
-
-                # Product price
-                price_selectors = [
-                    '.price',
-                    '.product-price',
-                    'span[itemprop="price"]',
-                    'meta[property="product:price:amount"]'
-                ]
-
-                for selector in price_selectors:
-                    if selector.startswith('meta'):
-                        element = soup.select_one(selector)
-                        if element and element.get('content'):
-                            product_info['price'] = element['content']
-                            break
-                    else:
-                        element = soup.select_one(selector)
-                        if element:
-                            product_info['price'] = element.text.strip()
-                            break
-
-                # Product description
-                description_selectors = [
-                    '.product-description',
-                    '.description',
-                    '[itemprop="description"]',
-                    'meta[property="og:description"]'
-                ]
-
-                for selector in description_selectors:
-                    if selector.startswith('meta'):
-                        element = soup.select_one(selector)
-                        if element and element.get('content'):
-                            product_info['description'] = element['content']
-                            break
-                    else:
-                        element = soup.select_one(selector)
-                        if element:
-                            product_info['description'] = element.text.strip()
-                            break
-
-                # Product images
-                image_selectors = [
-                    'meta[property="og:image"]',
-                    '[itemprop="image"]',
-                    '.product-image img',
-                    '.product img'
-                ]
-
-                product_images = []
-                for selector in image_selectors:
-                    if selector.startswith('meta'):
-                        element = soup.select_one(selector)
-                        if element and element.get('content'):
-                            product_images.append(element['content'])
-                    else:
-                        elements = soup.select(selector)
-                        for img in elements:
-                            if img.get('src'):
-                                product_images.append(img['src'])
-
-                if product_images:
-                    product_info['images'] = product_images
-
-                # Product SKU/ID
-                sku_selectors = [
-                    '[itemprop="sku"]',
-                    '.sku',
-                    '[data-product-id]'
-                ]
-
-                for selector in sku_selectors:
-                    element = soup.select_one(selector)
-                    if element:
-                        if selector == '[data-product-id]':
-                            product_info['sku'] = element.get('data-product-id')
-                        else:
-                            product_info['sku'] = element.text.strip()
-                        break
-
-                return {
-                    "url": url,
-                    "title": title,
-                    "content_type": "product",
-                    "product": product_info
-                }
-
-            else:
-                # This appears to be a category or other e-commerce page
-                # Extract general content
-                content_selectors = [
-                    '.page-content',
-                    '.content',
-                    'main',
-                    '#content'
-                ]
-
-                content_element = None
-                for selector in content_selectors:
-                    element = soup.select_one(selector)
-                    if element:
-                        content_element = element
-                        break
-
-                # Extract text from content element or fallback to body
-                paragraphs = []
-                if content_element:
-                    for p in content_element.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-                        text = p.get_text().strip()
-                        if text:
-                            paragraphs.append(text)
-                else:
-                    for p in soup.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-                        text = p.get_text().strip()
-                        if text:
-                            paragraphs.append(text)
-
-                content = "\n\n".join(paragraphs)
-
-                # Check if this is a category page
-                is_category_page = False
-                category_indicators = [
-                    '.products',
-                    '.product-list',
-                    '.category',
-                    '.collection'
-                ]
-
-                for indicator in category_indicators:
-                    if soup.select_one(indicator):
-                        is_category_page = True
-                        break
-
-                # Extract products on category page
-                products = []
-                if is_category_page:
-                    product_selectors = [
-                        '.product',
-                        '.product-item',
-                        '.product-card',
-                        '.collection-item'
-                    ]
-
-                    for selector in product_selectors:
-                        product_elements = soup.select(selector)
-                        for product_element in product_elements:
-                            product_data = {}
-
-                            # Extract product name
-                            name_element = product_element.select_one('h3') or product_element.select_one(
-                                'h2') or product_element.select_one('.name')
-                            if name_element:
-                                product_data['name'] = name_element.text.strip()
-
-                            # Extract product URL
-                            link_element = product_element.select_one('a')
-                            if link_element and link_element.get('href'):
-                                href = link_element['href']
-                                if not href.startswith(('http://', 'https://')):
-                                    href = urljoin(url, href)
-                                product_data['url'] = href
-
-                            # Extract product price
-                            price_element = product_element.select_one('.price')
-                            if price_element:
-                                product_data['price'] = price_element.text.strip()
-
-                            if product_data:
-                                products.append(product_data)
-
-                return {
-                    "url": url,
-                    "title": title,
-                    "content": content,
-                    "content_type": "category" if is_category_page else "ecommerce_page",
-                    "products": products if products else None
-                }
-
-        except Exception as e:
-            logger.error(f"Error extracting e-commerce content from {url}: {str(e)}")
-            return {"url": url, "error": f"Error extracting content: {str(e)}"}
-
-    async def discover_urls(self, html: str, url: str) -> List[str]:
-        """Discover e-commerce-specific URLs from HTML."""
-        if not html:
-            return []
-
-        discovered_urls = set()
-
-        try:
-            soup = BeautifulSoup(html, 'lxml')
-
-            # Find all links
-            links = soup.find_all('a', href=True)
-
-            for link in links:
-                href = link['href'].strip()
-
+    def _is_near_duplicate(self, fingerprint: int, token_count: int) -> bool:
+        """Check a page's text fingerprint against recently processed pages, remembering
+        it if it is new."""
+        distance = self.near_duplicate_distance if token_count >= _SIMHASH_MIN_TOKENS else 0
+        for seen in self._seen_hashes:
+            if (fingerprint ^ seen).bit_count() <= distance:
+                return True
+
+        self._seen_hashes.append(fingerprint)
+        return False
+
+    @staticmethod
+    def _scan_links(html: Union[str, lxml.html.HtmlElement],
+                    parent_classes: frozenset) -> Tuple[List[str], List[str]]:
+        """Return the hrefs of all links in the page, and of the links directly inside
+        an element with one of parent_classes.
+
+        Both are collected with one query each instead of inspecting every link's parent.
+        A page that is not parsed yet is read with selectolax's lexbor parser when it is
+        installed, which builds the tree faster than lxml for a plain link scan.
+        """
+        if isinstance(html, lxml.html.HtmlElement):
+            # Already parsed by process(), so reuse the tree
+            root = html
+        else:
+            if LexborHTMLParser is not None:
+                tree = LexborHTMLParser(html)
+                return ([link.attributes.get('href') or '' for link in tree.css('a[href]')],
+                        [link.attributes.get('href') or '' for link in tree.css(_parent_links_css(parent_classes))])
+
+            root = parse_document(html)
+            if root is None:
+                return [], []
+
+        return _HREF_XPATH(root), _parent_links_xpath(parent_classes)(root)
+
+    def _same_domain_links(self, hrefs: List[str], url: str) -> Iterator[str]:
+        """Yield the hrefs that point at this crawler's domain, as absolute URLs."""
+        # Bind what the per-link loop uses to locals; link-heavy pages run it thousands of times
+        domain_prefixes = self._domain_prefixes
+        domain_roots = self._domain_roots
+        resolve = _link_resolver(url)
+
+        for href in hrefs:
+            href = href.strip()
+
+            # Absolute http(s) links, the common case, skip straight to the domain check
+            if not href.startswith(('http://', 'https://')):
                 # Skip empty links, anchors, javascript, mailto etc.
-                if not href or href.startswith('#') or href.startswith('javascript:') or href.startswith('mailto:'):
+                if not href or href.startswith(_SKIP_PREFIXES):
                     continue
 
                 # Convert relative URLs to absolute
-                if not href.startswith(('http://', 'https://')):
-                    href = urljoin(url, href)
-
-                # Only include URLs from the same domain
-                parsed_href = urlparse(href)
-                if parsed_href.netloc == self.domain:
-                    # Look for e-commerce-specific patterns
-                    ecommerce_patterns = [
-                        r'/product/',
-                        r'/products/',
-                        r'/category/',
-                        r'/categories/',
-                        r'/catalog/',
-                        r'/shop/',
-                        r'/item/',
-                        r'/collection/'
-                    ]
-
-                    for pattern in ecommerce_patterns:
-                        if re.search(pattern, href):
-                            discovered_urls.add(href)
-                            break
-
-                    # Also check for links in product elements
-                    if link.parent and any(
-                            cls in link.parent.get('class', []) for cls in ['product', 'item', 'product-card']):
-                        discovered_urls.add(href)
-
-            return list(discovered_urls)
-
-        except Exception as e:
-            logger.error(f"Error discovering e-commerce URLs from {url}: {str(e)}")
-            return []
+                href = resolve(href)
 
+            # Only include URLs from the same domain. Navigation links repeat on every page,
+            # so intern them to share one string per URL across pages
+            if href.startswith(domain_prefixes) or href in domain_roots:
+                yield sys.intern(href)
 
-import logging
-import asyncio
-from typing import Dict, Any, List, Optional, Union
-from abc import ABC, abstractmethod
-from bs4 import BeautifulSoup
-import aiohttp
-import re
-from urllib.parse import urlparse, urljoin
-
-logger = logging.getLogger(__name__)
-
-
-class DomainCrawler(ABC):
-    """Base class for domain-specific crawlers."""
-
-    def __init__(self, base_url: str, user_agent: str = "RAGCrawler"):
-        self.base_url = base_url.rstrip('/')
-        self.domain = urlparse(base_url).netloc
-        self.user_agent = user_agent
-        self.headers = {
-            "User-Agent": f"{user_agent}/1.0",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Connection": "keep-alive"
-        }
+    async def fetch_url(self, url: str, session: Optional[aiohttp.ClientSession] = None) -> Optional[str]:
+        """Fetch the content of a URL, using the crawler's shared session unless one is given."""
+        try:
+            # The crawler's own session already sends its headers; add them for a caller's session
+            headers = None
+            if session is None:
+                session = await self._get_session()
+            else:
+                headers = self.headers
 
-    @abstractmethod
-    async def extract_content(self, html: str, url: str) -> Dict[str, Any]:
-        """Extract domain-specific content from HTML."""
-        pass
+            async with self._fetch_semaphore:
+                async with session.get(url, headers=headers) as response:
+                    if response.status == 200:
+                        data = await response.read()
+                        charset = response.charset
+                    else:
+                        logger.warning(f"Failed to fetch {url}: HTTP {response.status}")
+                        return None
+
+            # Decode with the declared charset instead of response.text(), which runs charset
+            # detection over the whole body when the header has none. Without one, the page's
+            # own <meta> declaration is used before falling back to utf-8.
+            if not charset:
+                match = _META_CHARSET_RE.search(data, 0, _META_SNIFF_BYTES)
+                if match:
+                    charset = match.group(1).decode('ascii')
+            try:
+                return data.decode(charset or 'utf-8', errors='replace')
+            except LookupError:
+                # Unknown charset name in the Content-Type header or <meta> tag
+                return data.decode('utf-8', errors='replace')
+        except Exception as e:
+            logger.error(f"Error fetching {url}: {str(e)}")
+            return None
 
-    @abstractmethod
-    async def discover_urls(self, html: str, url: str) -> List[str]:
-        """Discover domain-specific URLs from HTML."""
-        pass
+    async def fetch_tree(self, url: str,
+                         session: Optional[aiohttp.ClientSession] = None) -> Optional[lxml.html.HtmlElement]:
+        """Fetch a page and parse it as it downloads, returning the lxml tree.
 
-    async def fetch_url(self, url: str, session: aiohttp.ClientSession) -> Optional[str]:
-        """Fetch the content of a URL."""
+        The body is fed to an incremental lxml parser chunk by chunk, so parsing overlaps
+        with waiting on the network and the page is never held as one big string. The
+        tree can be passed straight to extract_content and discover_urls.
+        """
         try:
-            async with session.get(url, headers=self.headers) as response:
-                if response.status == 200:
-                    return await response.text()
-                else:
-                    logger.warning(f"Failed to fetch {url}: HTTP {response.status}")
-                    return None
+            # The crawler's own session already sends its headers; add them for a caller's session
+            headers = None
+            if session is None:
+                session = await self._get_session()
+            else:
+                headers = self.headers
+
+            async with self._fetch_semaphore:
+                async with session.get(url, headers=headers) as response:
+                    if response.status != 200:
+                        logger.warning(f"Failed to fetch {url}: HTTP {response.status}")
+                        return None
+
+                    # A feed parser holds one document's state, so it can't be the shared per-thread parser
+                    try:
+                        parser = lxml.html.HTMLParser(encoding=response.charset, **PARSER_OPTIONS)
+                    except LookupError:
+                        # Unknown charset name in the Content-Type header; let lxml detect it
+                        parser = lxml.html.HTMLParser(**PARSER_OPTIONS)
+
+                    async for chunk in response.content.iter_chunked(_FEED_CHUNK_SIZE):
+                        parser.feed(chunk)
+
+            return parser.close()
+        except etree.XMLSyntaxError:
+            # Document is empty
+            return None
         except Exception as e:
             logger.error(f"Error fetching {url}: {str(e)}")
             return None
@@ -832,58 +612,32 @@ class DomainCrawler(ABC):
 class BlogCrawler(DomainCrawler):
     """Crawler optimized for blog websites."""
 
-    async def extract_content(self, html: str, url: str) -> Dict[str, Any]:
-        """Extract blog-specific content from HTML."""
-        if not html:
+    def _extract_content_sync(self, html: Union[str, lxml.html.HtmlElement], url: str) -> Dict[str, Any]:
+        """Extract blog-specific content from HTML or an already parsed lxml tree."""
+        if _no_html(html):
             return {"url": url, "error": "No HTML content"}
 
         try:
-            soup = BeautifulSoup(html, 'lxml')
+            root = html if isinstance(html, lxml.html.HtmlElement) else parse_document(html)
+            if root is None:
+                return {"url": url, "error": "No HTML content"}
 
             # Extract title
-            title = ""
-            title_tag = soup.find('title')
-            if title_tag:
-                title = title_tag.text.strip()
+            title = (root.findtext('.//title') or '').strip()
 
             # Try to find blog post content using common patterns
-            content_selectors = [
-                'article',
-                '.post-content',
-                '.entry-content',
-                '.blog-post',
-                '.article-content',
-                '#content',
-                '.content',
-                'main'
-            ]
-
-            content_element = None
-            for selector in content_selectors:
-                # Try CSS selector
-                element = soup.select_one(selector)
-                if element:
-                    content_element = element
-                    break
-
-                # Try HTML tag
-                if selector.startswith('.') or selector.startswith('#'):
-                    continue
-                element = soup.find(selector)
-                if element:
-                    content_element = element
-                    break
+            content_element = _BLOG_CONTENT_SELECTOR.select_one(root)
 
             # Extract text from content element or fallback to body
-            if content_element:
-                paragraphs = content_element.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'li'])
+            if content_element is not None:
+                paragraphs = content_element.iterdescendants(*_BLOG_TEXT_TAGS)
             else:
-                paragraphs = soup.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+                paragraphs = root.iter(*_PAGE_TEXT_TAGS)
 
             # Extract text content
             content_parts = []
             for p in paragraphs:
-                text = p.get_text().strip()
+                text = p.text_content().strip()
                 if text and len(text) > 10:  # Skip very short paragraphs
                     content_parts.append(text)
 
@@ -893,76 +647,19 @@ class BlogCrawler(DomainCrawler):
             metadata = {}
 
             # Published date
-            date_selectors = [
-                'time',
-                '.post-date',
-                '.entry-date',
-                '.published',
-                'meta[property="article:published_time"]',
-                'meta[property="og:published_time"]'
-            ]
-
-            for selector in date_selectors:
-                if selector.startswith('meta'):
-                    element = soup.select_one(selector)
-                    if element and element.get('content'):
-                        metadata['published_date'] = element['content']
-                        break
-                else:
-                    element = soup.select_one(selector)
-                    if element:
-                        if element.get('datetime'):
-                            metadata['published_date'] = element['datetime']
-                            break
-                        elif element.text.strip():
-                            metadata['published_date'] = element.text.strip()
-                            break
+            published_date = _first_value(root, _BLOG_DATE_EXTRACTORS)
+            if published_date:
+                metadata['published_date'] = published_date
 
             # Author
-            author_selectors = [
-                '.author',
-                '.byline',
-                'meta[name="author"]',
-                'meta[property="article:author"]',
-                'a[rel="author"]'
-            ]
-
-            for selector in author_selectors:
-                if selector.startswith('meta'):
-                    element = soup.select_one(selector)
-                    if element and element.get('content'):
-                        metadata['author'] = element['content']
-                        break
-                else:
-                    element = soup.select_one(selector)
-                    if element:
-                        metadata['author'] = element.text.strip()
-                        break
-
-            # Categories/Tags
-            tags = []
-            tag_selectors = [
-                '.tags a',
-                '.categories a',
-                '.post-tags a',
-                'meta[property="article:tag"]'
-            ]
-
-            for selector in tag_selectors:
-                if selector.startswith('meta'):
-                    elements = soup.select(selector)
-                    for element in elements:
-                        if element.get('content'):
-                            tags.append(element['content'])
-                else:
-                    elements = soup.select(selector)
-                    for element in elements:
-                        tag_text = element.text.strip()
-                        if tag_text:
-                            tags.append(tag_text)
+            author = _first_value(root, _BLOG_AUTHOR_EXTRACTORS)
+            if author:
+                metadata['author'] = author
 
+            # Categories/Tags, deduplicated as they are collected (dict keeps first-seen order)
+            tags = dict.fromkeys(_all_values(root, _BLOG_TAG_EXTRACTORS))
             if tags:
-                metadata['tags'] = list(set(tags))  # Remove duplicates
+                metadata['tags'] = list(tags)
 
             return {
                 "url": url,
@@ -976,188 +673,70 @@ class BlogCrawler(DomainCrawler):
             logger.error(f"Error extracting blog content from {url}: {str(e)}")
             return {"url": url, "error": f"Error extracting content: {str(e)}"}
 
-    async def discover_urls(self, html: str, url: str) -> List[str]:
-        """Discover blog-specific URLs from HTML."""
-        if not html:
-            return []
-
-        discovered_urls = set()
-
-        try:
-            soup = BeautifulSoup(html, 'lxml')
-
-            # Find all links
-            links = soup.find_all('a', href=True)
-
-            for link in links:
-                href = link['href'].strip()
-
-                # Skip empty links, anchors, javascript, mailto etc.
-                if not href or href.startswith('#') or href.startswith('javascript:') or href.startswith('mailto:'):
-                    continue
-
-                # Convert relative URLs to absolute
-                if not href.startswith(('http://', 'https://')):
-                    href = urljoin(url, href)
-
-                # Only include URLs from the same domain
-                parsed_href = urlparse(href)
-                if parsed_href.netloc == self.domain:
-                    # Look for blog-specific patterns
-                    blog_patterns = [
-                        r'/blog/',
-                        r'/post/',
-                        r'/article/',
-                        r'/\d{4}/\d{2}/',  # Date-based archives
-                        r'/category/',
-                        r'/tag/'
-                    ]
-
-                    for pattern in blog_patterns:
-                        if re.search(pattern, href):
-                            discovered_urls.add(href)
-                            break
-
-                    # Also check for links in blog index pages
-                    if link.parent and (
-                            'post' in link.parent.get('class', []) or
-                            'blog' in link.parent.get('class', []) or
-                            'article' in link.parent.get('class', [])
-                    ):
-                        discovered_urls.add(href)
-
-            return list(discovered_urls)
-
-        except Exception as e:
-            logger.error(f"Error discovering blog URLs from {url}: {str(e)}")
-            return []
+    def _discover_urls_sync(self, html: Union[str, lxml.html.HtmlElement], url: str) -> List[str]:
+        """Discover blog-specific URLs from HTML or an already parsed lxml tree."""
+        # Blog-specific URL patterns, plus links in blog index pages
+        return self._discover_urls_impl(html, url, _BLOG_URL_RE, _BLOG_LINK_PARENT_CLASSES, 'blog')
 
 
 class DocumentationCrawler(DomainCrawler):
     """Crawler optimized for documentation websites."""
 
-    async def extract_content(self, html: str, url: str) -> Dict[str, Any]:
-        """Extract documentation-specific content from HTML."""
-        if not html:
+    def _extract_content_sync(self, html: Union[str, lxml.html.HtmlElement], url: str) -> Dict[str, Any]:
+        """Extract documentation-specific content from HTML or an already parsed lxml tree."""
+        if _no_html(html):
             return {"url": url, "error": "No HTML content"}
 
         try:
-            soup = BeautifulSoup(html, 'lxml')
+            root = html if isinstance(html, lxml.html.HtmlElement) else parse_document(html)
+            if root is None:
+                return {"url": url, "error": "No HTML content"}
 
             # Extract title
-            title = ""
-            title_tag = soup.find('title')
-            if title_tag:
-                title = title_tag.text.strip()
+            title = (root.findtext('.//title') or '').strip()
 
             # Try to find documentation content using common patterns
-            content_selectors = [
-                '.documentation',
-                '.docs',
-                '.doc-content',
-                '.markdown-body',
-                '.content',
-                'article',
-                'main'
-            ]
-
-            content_element = None
-            for selector in content_selectors:
-                # Try CSS selector
-                element = soup.select_one(selector)
-                if element:
-                    content_element = element
-                    break
-
-                # Try HTML tag
-                if selector.startswith('.') or selector.startswith('#'):
-                    continue
-                element = soup.find(selector)
-                if element:
-                    content_element = element
-                    break
+            content_element = _DOC_CONTENT_SELECTOR.select_one(root)
 
             # Extract structured content
             structured_content = {}
 
-            # Extract headings
+            # Extract headings, paragraphs and code blocks in a single walk of the tree
             headings = []
-            if content_element:
-                for level in range(1, 7):
-                    for heading in content_element.find_all(f'h{level}'):
-                        headings.append({
-                            "level": level,
-                            "text": heading.get_text().strip(),
-                            "id": heading.get('id', '')
-                        })
-            else:
-                for level in range(1, 7):
-                    for heading in soup.find_all(f'h{level}'):
-                        headings.append({
-                            "level": level,
-                            "text": heading.get_text().strip(),
-                            "id": heading.get('id', '')
-                        })
-
-            structured_content['headings'] = headings
-
-            # Extract paragraphs and code blocks
             paragraphs = []
             code_blocks = []
 
-            if content_element:
-                # Extract paragraphs
-                for p in content_element.find_all('p'):
-                    text = p.get_text().strip()
-                    if text:
-                        paragraphs.append(text)
-
-                # Extract code blocks
-                for code in content_element.find_all(['pre', 'code']):
-                    # Skip if it's a 'code' inside a 'pre' to avoid duplication
-                    if code.name == 'code' and code.parent.name == 'pre':
-                        continue
+            for element in _DOC_NODES_XPATH(content_element if content_element is not None else root):
+                tag = element.tag
 
-                    code_text = code.get_text().strip()
-                    if code_text:
-                        language = ''
-                        if code.get('class'):
-                            for cls in code.get('class'):
-                                if cls.startswith('language-') or cls.startswith('lang-'):
-                                    language = cls.split('-')[1]
-                                    break
+                if tag[0] == 'h':
+                    headings.append({
+                        "level": int(tag[1]),
+                        "text": element.text_content().strip(),
+                        "id": element.get('id', '')
+                    })
 
-                        code_blocks.append({
-                            "code": code_text,
-                            "language": language
-                        })
-            else:
-                # Extract paragraphs
-                for p in soup.find_all('p'):
-                    text = p.get_text().strip()
+                elif tag == 'p':
+                    text = element.text_content().strip()
                     if text:
                         paragraphs.append(text)
 
-                # Extract code blocks
-                for code in soup.find_all(['pre', 'code']):
-                    # Skip if it's a 'code' inside a 'pre' to avoid duplication
-                    if code.name == 'code' and code.parent.name == 'pre':
-                        continue
-
-                    code_text = code.get_text().strip()
+                else:
+                    # <pre> or a <code> outside of one; the XPath skips code inside pre
+                    code_text = element.text_content().strip()
                     if code_text:
-                        language = ''
-                        if code.get('class'):
-                            for cls in code.get('class'):
-                                if cls.startswith('language-') or cls.startswith('lang-'):
-                                    language = cls.split('-')[1]
-                                    break
+                        match = _LANG_CLASS_RE.search(element.get('class') or '')
+                        language = match.group(1) if match else ''
 
                         code_blocks.append({
                             "code": code_text,
                             "language": language
                         })
 
+            # Headings are grouped by level (all h1s, then h2s, ...), in document order within a level
+            headings.sort(key=lambda heading: heading['level'])
+
+            structured_content['headings'] = headings
             structured_content['paragraphs'] = paragraphs
             structured_content['code_blocks'] = code_blocks
 
@@ -1184,23 +763,16 @@ class DocumentationCrawler(DomainCrawler):
             metadata = {}
 
             # Try to find documentation version
-            version_selectors = [
-                '.version',
-                '.doc-version',
-                'meta[name="version"]'
-            ]
-
-            for selector in version_selectors:
-                if selector.startswith('meta'):
-                    element = soup.select_one(selector)
-                    if element and element.get('content'):
-                        metadata['version'] = element['content']
-                        break
-                else:
-                    element = soup.select_one(selector)
-                    if element:
-                        metadata['version'] = element.text.strip()
+            version = None
+            for xpath in _DOC_VERSION_XPATHS:
+                found = xpath(root)
+                if found:
+                    # The meta XPath yields the content attribute string itself
+                    version = found[0] if isinstance(found[0], str) else found[0].text_content().strip()
+                    if version:
                         break
+            if version:
+                metadata['version'] = version
 
             return {
                 "url": url,
@@ -1215,190 +787,65 @@ class DocumentationCrawler(DomainCrawler):
             logger.error(f"Error extracting documentation content from {url}: {str(e)}")
             return {"url": url, "error": f"Error extracting content: {str(e)}"}
 
-    async def discover_urls(self, html: str, url: str) -> List[str]:
-        """Discover documentation-specific URLs from HTML."""
-        if not html:
-            return []
-
-        discovered_urls = set()
-
-        try:
-            soup = BeautifulSoup(html, 'lxml')
-
-            # Find all links
-            links = soup.find_all('a', href=True)
-
-            for link in links:
-                href = link['href'].strip()
-
-                # Skip empty links, anchors, javascript, mailto etc.
-                if not href or href.startswith('#') or href.startswith('javascript:') or href.startswith('mailto:'):
-                    continue
-
-                # Convert relative URLs to absolute
-                if not href.startswith(('http://', 'https://')):
-                    href = urljoin(url, href)
-
-                # Only include URLs from the same domain
-                parsed_href = urlparse(href)
-                if parsed_href.netloc == self.domain:
-                    # Look for documentation-specific patterns
-                    doc_patterns = [
-                        r'/docs/',
-                        r'/documentation/',
-                        r'/guide/',
-                        r'/tutorial/',
-                        r'/manual/',
-                        r'/reference/',
-                        r'/api/'
-                    ]
-
-                    for pattern in doc_patterns:
-                        if re.search(pattern, href):
-                            discovered_urls.add(href)
-                            break
-
-                    # Also check for links in navigation elements
-                    if link.parent and any(
-                            cls in link.parent.get('class', []) for cls in ['nav', 'sidebar', 'toc', 'menu']):
-                        discovered_urls.add(href)
-
-            return list(discovered_urls)
-
-        except Exception as e:
-            logger.error(f"Error discovering documentation URLs from {url}: {str(e)}")
-            return []
+    def _discover_urls_sync(self, html: Union[str, lxml.html.HtmlElement], url: str) -> List[str]:
+        """Discover documentation-specific URLs from HTML or an already parsed lxml tree."""
+        # Documentation-specific URL patterns, plus links in navigation elements
+        return self._discover_urls_impl(html, url, _DOC_URL_RE, _DOC_LINK_PARENT_CLASSES, 'documentation')
 
 
 class EcommerceCrawler(DomainCrawler):
     """Crawler optimized for e-commerce websites."""
 
-    async def extract_content(self, html: str, url: str) -> Dict[str, Any]:
-        """Extract e-commerce-specific content from HTML."""
-        if not html:
+    def _extract_content_sync(self, html: Union[str, lxml.html.HtmlElement], url: str) -> Dict[str, Any]:
+        """Extract e-commerce-specific content from HTML or an already parsed lxml tree."""
+        if _no_html(html):
             return {"url": url, "error": "No HTML content"}
 
         try:
-            soup = BeautifulSoup(html, 'lxml')
+            root = html if isinstance(html, lxml.html.HtmlElement) else parse_document(html)
+            if root is None:
+                return {"url": url, "error": "No HTML content"}
 
             # Extract title
-            title = ""
-            title_tag = soup.find('title')
-            if title_tag:
-                title = title_tag.text.strip()
+            title = (root.findtext('.//title') or '').strip()
 
             # Check if this is a product page
-            is_product_page = False
-            product_indicators = [
-                'meta[property="og:type"][content="product"]',
-                '.product',
-                '#product',
-                'form[action*="cart"]',
-                'button[name*="add"]',
-                'input[name*="add_to_cart"]'
-            ]
-
-            for indicator in product_indicators:
-                if soup.select_one(indicator):
-                    is_product_page = True
-                    break
+            is_product_page = _PRODUCT_INDICATOR(root)
 
             if is_product_page:
                 # Extract product information
                 product_info = {}
 
                 # Product name
-                product_name_selectors = [
-                    'h1.product-title',
-                    '.product-name',
-                    '.product-title',
-                    'h1',
-                ]
-
-                for selector in product_name_selectors:
-                    element = soup.select_one(selector)
-                    if element:
-                        product_info['name'] = element.text.strip()
-                        break
+                element = _PRODUCT_NAME_SELECTOR.select_one(root)
+                if element is not None:
+                    product_info['name'] = element.text_content().strip()
 
-                # Product price
-                price_selectors = [
-                    '.price',
-                    '.product-price',
-                    'span[itemprop="price"]',
-                    'meta[property="product:price:amount"]'
-                ]
-
-                for selector in price_selectors:
-                    if selector.startswith('meta'):
-                        element = soup.select_one(selector)
-                        if element and element.get('content'):
-                            product_info['price'] = element['content']
-                            break
-                    else:
-                        element = soup.select_one(selector)
-                        if element:
-                            product_info['price'] = element.text.strip()
-                            break
-
-                # Product description
-                description_selectors = [
-                    '.product-description',
-                    '.description',
-                    '[itemprop="description"]',
-                    'meta[property="og:description"]'
-                ]
-
-                for selector in description_selectors:
-                    if selector.startswith('meta'):
-                        element = soup.select_one(selector)
-                        if element and element.get('content'):
-                            product_info['description'] = element['content']
-                            break
-                    else:
-                        element = soup.select_one(selector)
-                        if element:
-                            product_info['description'] = element.text.strip()
-                            break
+                # Product price and description
+                for key, extractors in (('price', _PRODUCT_PRICE_EXTRACTORS),
+                                        ('description', _PRODUCT_DESCRIPTION_EXTRACTORS)):
+                    value = _first_value(root, extractors)
+                    if value:
+                        product_info[key] = value
 
                 # Product images
-                image_selectors = [
-                    'meta[property="og:image"]',
-                    '[itemprop="image"]',
-                    '.product-image img',
-                    '.product img'
-                ]
-
                 product_images = []
-                for selector in image_selectors:
-                    if selector.startswith('meta'):
-                        element = soup.select_one(selector)
-                        if element and element.get('content'):
-                            product_images.append(element['content'])
-                    else:
-                        elements = soup.select(selector)
-                        for img in elements:
-                            if img.get('src'):
-                                product_images.append(img['src'])
+                element = _PRODUCT_IMAGE_META_SELECTOR.select_one(root)
+                if element is not None and element.get('content'):
+                    product_images.append(element.get('content'))
+
+                for xpath in _PRODUCT_IMAGE_XPATHS:
+                    for img in xpath(root):
+                        if img.get('src'):
+                            product_images.append(img.get('src'))
 
                 if product_images:
                     product_info['images'] = product_images
 
                 # Product SKU/ID
-                sku_selectors = [
-                    '[itemprop="sku"]',
-                    '.sku',
-                    '[data-product-id]'
-                ]
-
-                for selector in sku_selectors:
-                    element = soup.select_one(selector)
-                    if element:
-                        if selector == '[data-product-id]':
-                            product_info['sku'] = element.get('data-product-id')
-                        else:
-                            product_info['sku'] = element.text.strip()
-                        break
+                sku = _first_value(root, _PRODUCT_SKU_EXTRACTORS)
+                if sku:
+                    product_info['sku'] = sku
 
                 return {
                     "url": url,
@@ -1410,85 +857,51 @@ class EcommerceCrawler(DomainCrawler):
             else:
                 # This appears to be a category or other e-commerce page
                 # Extract general content
-                content_selectors = [
-                    '.page-content',
-                    '.content',
-                    'main',
-                    '#content'
-                ]
-
-                content_element = None
-                for selector in content_selectors:
-                    element = soup.select_one(selector)
-                    if element:
-                        content_element = element
-                        break
+                content_element = _SHOP_CONTENT_SELECTOR.select_one(root)
 
                 # Extract text from content element or fallback to body
-                paragraphs = []
-                if content_element:
-                    for p in content_element.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-                        text = p.get_text().strip()
-                        if text:
-                            paragraphs.append(text)
+                if content_element is not None:
+                    elements = content_element.iterdescendants(*_PAGE_TEXT_TAGS)
                 else:
-                    for p in soup.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-                        text = p.get_text().strip()
-                        if text:
-                            paragraphs.append(text)
+                    elements = root.iter(*_PAGE_TEXT_TAGS)
+
+                paragraphs = []
+                for p in elements:
+                    text = p.text_content().strip()
+                    if text:
+                        paragraphs.append(text)
 
                 content = "\n\n".join(paragraphs)
 
                 # Check if this is a category page
-                is_category_page = False
-                category_indicators = [
-                    '.products',
-                    '.product-list',
-                    '.category',
-                    '.collection'
-                ]
-
-                for indicator in category_indicators:
-                    if soup.select_one(indicator):
-                        is_category_page = True
-                        break
+                is_category_page = _CATEGORY_INDICATOR(root)
 
                 # Extract products on category page
                 products = []
                 if is_category_page:
-                    product_selectors = [
-                        '.product',
-                        '.product-item',
-                        '.product-card',
-                        '.collection-item'
-                    ]
-
-                    for selector in product_selectors:
-                        product_elements = soup.select(selector)
-                        for product_element in product_elements:
-                            product_data = {}
-
-                            # Extract product name
-                            name_element = product_element.select_one('h3') or product_element.select_one(
-                                'h2') or product_element.select_one('.name')
-                            if name_element:
-                                product_data['name'] = name_element.text.strip()
-
-                            # Extract product URL
-                            link_element = product_element.select_one('a')
-                            if link_element and link_element.get('href'):
-                                href = link_element['href']
-                                if not href.startswith(('http://', 'https://')):
-                                    href = urljoin(url, href)
-                                product_data['url'] = href
-
-                            # Extract product price
-                            price_element = product_element.select_one('.price')
-                            if price_element:
-                                product_data['price'] = price_element.text.strip()
-
-                            if product_data:
-                                products.append(product_data)
+                    for product_element in _CATEGORY_PRODUCT_XPATH(root):
+                        product_data = {}
+
+                        # Extract product name
+                        name_element = _CATEGORY_ITEM_NAME_SELECTOR.select_one(product_element)
+                        if name_element is not None:
+                            product_data['name'] = name_element.text_content().strip()
+
+                        # Extract product URL
+                        link_element = _CATEGORY_ITEM_LINK_SELECTOR.select_one(product_element)
+                        if link_element is not None and link_element.get('href'):
+                            href = link_element.get('href')
+                            if not href.startswith(('http://', 'https://')):
+                                href = urljoin(url, href)
+                            product_data['url'] = href
+
+                        # Extract product price
+                        price_element = _CATEGORY_ITEM_PRICE_SELECTOR.select_one(product_element)
+                        if price_element is not None:
+                            product_data['price'] = price_element.text_content().strip()
+
+                        if product_data:
+                            products.append(product_data)
 
                 return {
                     "url": url,
@@ -1502,78 +915,37 @@ class EcommerceCrawler(DomainCrawler):
             logger.error(f"Error extracting e-commerce content from {url}: {str(e)}")
             return {"url": url, "error": f"Error extracting content: {str(e)}"}
 
-    async def discover_urls(self, html: str, url: str) -> List[str]:
-        """Discover e-commerce-specific URLs from HTML."""
-        if not html:
-            return []
-
-        discovered_urls = set()
-
-        try:
-            soup = BeautifulSoup(html, 'lxml')
-
-            # Find all links
-            links = soup.find_all('a', href=True)
-
-            for link in links:
-                href = link['href'].strip()
-
-                # Skip empty links, anchors, javascript, mailto etc.
-                if not href or href.startswith('#') or href.startswith('javascript:') or href.startswith('mailto:'):
-                    continue
-
-                # Convert relative URLs to absolute
-                if not href.startswith(('http://', 'https://')):
-                    href = urljoin(url, href)
-
-                # Only include URLs from the same domain
-                parsed_href = urlparse(href)
-                if parsed_href.netloc == self.domain:
-                    # Look for e-commerce-specific patterns
-                    ecommerce_patterns = [
-                        r'/product/',
-                        r'/products/',
-                        r'/category/',
-                        r'/categories/',
-                        r'/catalog/',
-                        r'/shop/',
-                        r'/item/',
-                        r'/collection/'
-                    ]
-
-                    for pattern in ecommerce_patterns:
-                        if re.search(pattern, href):
-                            discovered_urls.add(href)
-                            break
-
-                    # Also check for links in product elements
-                    if link.parent and any(
-                            cls in link.parent.get('class', []) for cls in ['product', 'item', 'product-card']):
-                        discovered_urls.add(href)
-
-            return list(discovered_urls)
+    def _discover_urls_sync(self, html: Union[str, lxml.html.HtmlElement], url: str) -> List[str]:
+        """Discover e-commerce-specific URLs from HTML or an already parsed lxml tree."""
+        # E-commerce-specific URL patterns, plus links in product elements
+        return self._discover_urls_impl(html, url, _ECOM_URL_RE, _ECOM_LINK_PARENT_CLASSES, 'e-commerce')
 
-        except Exception as e:
-            logger.error(f"Error discovering e-commerce URLs from {url}: {str(e)}")
-            return []
 
+# URL path fragments that identify the website type, checked in this order
+_CRAWLER_PATH_PATTERNS = (
+    (re.compile(r'/blog|/post|/article|/news'), BlogCrawler),
+    (re.compile(r'/docs|/documentation|/guide|/tutorial|/manual|/reference|/api'), DocumentationCrawler),
+    (re.compile(r'/products?|/category|/shop|/store|/item'), EcommerceCrawler),
+)
 
-def get_domain_crawler(url: str, user_agent: str = "RAGCrawler") -> DomainCrawler:
-    """Factory function to get the appropriate domain crawler for a URL."""
-    # Parse URL to determine the appropriate crawler
-    parsed_url = urlparse(url)
-    path = parsed_url.path.lower()
 
+@lru_cache(maxsize=4096)
+def _crawler_class_for_path(path: str) -> type:
+    """Return the crawler class for a lowercased URL path."""
     # Check URL path patterns to determine website type
-    if any(pattern in path for pattern in ['/blog', '/post', '/article', '/news']):
-        return BlogCrawler(url, user_agent)
-    elif any(pattern in path for pattern in
-             ['/docs', '/documentation', '/guide', '/tutorial', '/manual', '/reference', '/api']):
-        return DocumentationCrawler(url, user_agent)
-    elif any(pattern in path for pattern in ['/product', '/products', '/category', '/shop', '/store', '/item']):
-        return EcommerceCrawler(url, user_agent)
+    for pattern, crawler_cls in _CRAWLER_PATH_PATTERNS:
+        if pattern.search(path):
+            return crawler_cls
 
     # If no specific pattern matches, try to detect from the HTML content
     # This would require fetching the page and analyzing it
     # For now, default to a generic blog crawler
-    return BlogCrawler(url, user_agent)
\ No newline at end of file
+    return BlogCrawler
+
+
+def get_domain_crawler(url: str, user_agent: str = "RAGCrawler") -> DomainCrawler:
+    """Factory function to get the appropriate domain crawler for a URL."""
+    # Parse URL to determine the appropriate crawler; the classification only
+    # depends on the path, so it is cached per path
+    path = urlparse(url).path.lower()
+    return _crawler_class_for_path(path)(url, user_agent)
\ No newline at end of file
@@ -1,58 +1,166 @@
 import aiohttp
 import asyncio
-from bs4 import BeautifulSoup, Comment
 import logging
-import re
-from typing import Dict, Any, List, Optional, Set, Tuple
-from urllib.parse import urlparse, urljoin
-import trafilatura
-import readability
-import time
-import json
+from html import unescape
+from typing import Dict, Any, List, Optional, Set, Tuple, Union
+from urllib.parse import urljoin
+import lxml.html
+from lxml import etree
+import orjson
+import copy
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
+
+from crawler.robots.robots_parser import RobotsParser
+from crawler.utils.helpers import browser_headers, create_session, netloc, parse_document
+from crawler.utils.process_pool import PROCESS_POOL_ENABLED, run_in_process_pool
 
 logger = logging.getLogger(__name__)
 
+# Everything extract_structured_content reads, in document order, in a single walk
+_STRUCTURE_XPATH = etree.XPath('//h1|//h2|//h3|//h4|//h5|//h6|//p|//ul|//ol')
+
+# Elements whose text is not part of the readable content (scripts, styles, ruby
+# annotations, template bodies); BeautifulSoup's get_text() skips these as well
+_NON_TEXT_TAGS = ('script', 'style', 'rt', 'rp', 'template')
+
+# Markdown heading markers, indexed by heading level
+_HEADING_PREFIXES = ('', '#', '##', '###', '####', '#####', '######')
+
+# <meta> names extract_metadata copies into the metadata as-is
+_META_KEYS = frozenset(['description', 'keywords', 'author', 'robots'])
+
+# <meta property> values that carry a page's publication date
+_DATE_PROPERTIES = frozenset(['article:published_time', 'og:published_time'])
+
+
+@lru_cache(maxsize=8)
+def _worker_extractor(extractor_cls: type) -> 'EnhancedHTMLContentExtractor':
+    """Return this worker process's extractor of the given class, created on first use."""
+    return extractor_cls()
+
+
+def _extract_page(extractor_cls: type, html: str, url: str) -> Dict[str, Any]:
+    """Worker process entry point: extract a fetched page into a picklable result dict."""
+    return _worker_extractor(extractor_cls).extract_from_html(html, url)
+
+
+def _parse_html(html: str) -> Optional[lxml.html.HtmlElement]:
+    """Parse a page with trafilatura's loader, so the tree can be handed straight back to it.
+
+    Returns None when trafilatura would reject the document as not being HTML.
+    """
+    # trafilatura (and readability below) are imported on first use: they are slow to
+    # import and not needed by code that only imports this module
+    import trafilatura
+
+    try:
+        return trafilatura.load_html(html)
+    except Exception:
+        return None
+
 
 class EnhancedHTMLContentExtractor:
     """Enhanced extractor for HTML content with advanced cleaning and preprocessing."""
 
-    def __init__(self, user_agent: str = "RAGCrawler"):
-        self.headers = {
-            "User-Agent": f"{user_agent}/1.0",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Connection": "keep-alive"
-        }
-        self.last_request_time = {}
-
-    async def fetch_url(self, url: str, session: aiohttp.ClientSession, delay: float = 1.0) -> Optional[str]:
-        """Fetch the content of a URL with rate limiting."""
+    def __init__(self, user_agent: str = "RAGCrawler",
+                 session: Optional[aiohttp.ClientSession] = None,
+                 robots_parser: Optional[RobotsParser] = None):
+        self.headers = browser_headers(user_agent)
+        self.max_concurrency = 10  # Upper bound on in-flight requests across all domains
+        self._fetch_semaphore = asyncio.Semaphore(self.max_concurrency)
+        # Per-domain rate limit: a one-token bucket refilled every `delay` seconds, kept as
+        # the event loop time at which the domain's next request may start
+        self._next_request_slot: Dict[str, float] = {}
+        # When given, a site's robots.txt Crawl-delay raises its delay (it caches rules per site)
+        self.robots_parser = robots_parser
+        self._crawl_delays: Dict[str, float] = {}
+        self._session = session
+        self._owns_session = session is None
+        # Whether extract_from_url extracts pages in the shared process pool (crawler.utils.process_pool)
+        # rather than a thread; boilerplate removal is CPU-bound and holds the GIL
+        self.use_process_pool = PROCESS_POOL_ENABLED
+        # Results of recently extracted pages keyed by a hash of their HTML, so byte-identical
+        # pages (tracking-parameter variants, mirrors) are only extracted once; LRU-bounded
+        self.extract_cache_size = 1024
+        self._extract_cache: OrderedDict = OrderedDict()
+
+    async def __aenter__(self) -> "EnhancedHTMLContentExtractor":
+        await self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the session pages are fetched with, creating one on first use."""
+        if self._session is None or self._session.closed:
+            # Batches span many sites, so DNS lookups go through aiodns when it is installed
+            self._session = create_session(limit_per_host=4, keepalive_timeout=75, headers=self.headers,
+                                           async_dns=True)
+            self._owns_session = True
+        return self._session
+
+    async def close(self) -> None:
+        """Close the HTTP session if this extractor created it."""
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def fetch_url(self, url: str, session: Optional[aiohttp.ClientSession] = None,
+                        delay: float = 1.0) -> Optional[str]:
+        """Fetch the content of a URL with rate limiting, using the shared session by default."""
         try:
+            if session is None:
+                session = await self._get_session()
+
             # Apply rate limiting
-            domain = urlparse(url).netloc
-            if domain in self.last_request_time:
-                time_since_last_request = time.time() - self.last_request_time[domain]
-                if time_since_last_request < delay:
-                    await asyncio.sleep(delay - time_since_last_request)
+            domain = netloc(url)
+            await self._wait_for_rate_limit(url, domain, delay)
 
             # Make the request
-            self.last_request_time[domain] = time.time()
-            async with session.get(url, headers=self.headers, allow_redirects=True) as response:
-                if response.status == 200:
-                    return await response.text()
-                else:
-                    logger.warning(f"Failed to fetch {url}: HTTP {response.status}")
-                    return None
+            async with self._fetch_semaphore:
+                async with session.get(url, headers=self.headers, allow_redirects=True) as response:
+                    if response.status == 200:
+                        return await response.text()
+                    else:
+                        logger.warning(f"Failed to fetch {url}: HTTP {response.status}")
+                        return None
         except Exception as e:
             logger.error(f"Error fetching {url}: {str(e)}")
             return None
 
-    def remove_boilerplate(self, html: str) -> str:
-        """Remove boilerplate content using trafilatura."""
+    async def _wait_for_rate_limit(self, url: str, domain: str, delay: float) -> None:
+        """Reserve the domain's next request slot and sleep until it comes up.
+
+        The slot is claimed before any await, so concurrent fetches to one site get
+        distinct slots spaced by the delay instead of all reading the same timestamp.
+        """
+        if self.robots_parser is not None:
+            if domain not in self._crawl_delays:
+                _, self._crawl_delays[domain] = await self.robots_parser.is_allowed(url)
+            delay = max(delay, self._crawl_delays[domain])
+
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self._next_request_slot.get(domain, now))
+        self._next_request_slot[domain] = slot + delay
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def remove_boilerplate(self, html: str, tree: Optional[lxml.html.HtmlElement] = None) -> str:
+        """Remove boilerplate content using trafilatura.
+
+        ``tree`` is the page already parsed by ``_parse_html``; passing it spares
+        trafilatura from parsing it again.
+        """
+        import trafilatura
+
         try:
-            extracted = trafilatura.extract(html, include_comments=False, include_tables=True,
-                                            include_links=True, include_images=False)
+            # fast=True skips trafilatura's own backup extractors; readability below is ours
+            extracted = trafilatura.extract(html if tree is None else tree, include_comments=False, include_tables=True,
+                                            include_links=True, include_images=False, fast=True)
             if extracted:
                 return extracted
         except Exception as e:
@@ -60,6 +168,8 @@ class EnhancedHTMLContentExtractor:
 
         # Fallback to readability if trafilatura fails
         try:
+            import readability
+
             doc = readability.Document(html)
             return doc.summary()
         except Exception as e:
@@ -73,129 +183,128 @@ class EnhancedHTMLContentExtractor:
         if not text:
             return ""
 
-        # Replace multiple newlines with a single one
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-
-        # Remove HTML entities
-        text = re.sub(r'&[a-zA-Z0-9]+;', ' ', text)
-
-        # Normalize whitespace
-        text = text.strip()
-
-        return text
+        # Decode leftover HTML entities (an entity can decode to whitespace, e.g. &nbsp;),
+        # then collapse every whitespace run, newlines included, to a single space;
+        # str.split() treats exactly the characters \s matches as whitespace
+        return " ".join(unescape(text).split())
 
     def extract_structured_content(self, html: str) -> Dict[str, Any]:
         """Extract structured content from HTML (like headings, paragraphs, lists)."""
         if not html:
             return {"headings": [], "paragraphs": [], "lists": []}
 
-        soup = BeautifulSoup(html, 'lxml')
-
-        # Extract headings
-        headings = []
-        for level in range(1, 7):
-            for heading in soup.find_all(f'h{level}'):
-                headings.append({
-                    "level": level,
-                    "text": heading.get_text().strip()
-                })
+        root = parse_document(html)
+        if root is None:
+            return {"headings": [], "paragraphs": [], "lists": []}
+        etree.strip_elements(root, *_NON_TEXT_TAGS, with_tail=False)
 
-        # Extract paragraphs
+        # Headings are grouped by level (all h1s, then all h2s, ...), the rest
+        # stay in document order
+        headings_by_level = [[] for _ in range(6)]
         paragraphs = []
-        for p in soup.find_all('p'):
-            text = p.get_text().strip()
-            if text and len(text) > 10:  # Ignore very short paragraphs
-                paragraphs.append(text)
-
-        # Extract lists
         lists = []
-        for list_tag in soup.find_all(['ul', 'ol']):
-            items = []
-            for item in list_tag.find_all('li'):
-                text = item.get_text().strip()
-                if text:
-                    items.append(text)
-            if items:
-                lists.append({
-                    "type": list_tag.name,
-                    "items": items
+        for node in _STRUCTURE_XPATH(root):
+            tag = node.tag
+            if tag == 'p':
+                text = node.text_content().strip()
+                if len(text) > 10:  # Ignore very short paragraphs
+                    paragraphs.append(text)
+            elif tag == 'ul' or tag == 'ol':
+                items = []
+                for item in node.iter('li'):
+                    text = item.text_content().strip()
+                    if text:
+                        items.append(text)
+                if items:
+                    lists.append({
+                        "type": tag,
+                        "items": items
+                    })
+            else:
+                level = int(tag[1])
+                headings_by_level[level - 1].append({
+                    "level": level,
+                    "text": node.text_content().strip()
                 })
 
+        headings = [heading for level_headings in headings_by_level for heading in level_headings]
+
         return {
             "headings": headings,
             "paragraphs": paragraphs,
             "lists": lists
         }
 
-    def extract_metadata(self, html: str, url: str) -> Dict[str, Any]:
-        """Extract comprehensive metadata from HTML."""
-        if not html:
-            return {}
+    def extract_metadata(self, html: Union[str, lxml.html.HtmlElement], url: str) -> Dict[str, Any]:
+        """Extract comprehensive metadata from HTML or an already parsed page."""
+        if isinstance(html, str):
+            if not html:
+                return {}
+            tree = _parse_html(html)
+            if tree is None:
+                try:
+                    tree = lxml.html.document_fromstring(html)
+                except etree.ParserError:
+                    tree = None
+        else:
+            tree = html
+        if tree is not None:
+            # Fragments parse to an element inside a generated document; read from its root
+            tree = tree.getroottree().getroot()
 
-        soup = BeautifulSoup(html, 'lxml')
         metadata = {
             "url": url,
-            "domain": urlparse(url).netloc
+            "domain": netloc(url)
         }
+        if tree is None:
+            return metadata
 
         # Extract title
-        title_tag = soup.find('title')
-        if title_tag:
-            metadata["title"] = title_tag.text.strip()
+        title_tag = tree.find('.//title')
+        if title_tag is not None:
+            metadata["title"] = title_tag.text_content().strip()
 
-        # Extract meta tags
-        for meta in soup.find_all('meta'):
-            name = meta.get('name', meta.get('property', ''))
-            content = meta.get('content', '')
+        # Extract meta tags, picking up the publication date in the same pass
+        published_time = None
+        for meta in tree.iter('meta'):
+            attrs = meta.attrib
+            name = attrs.get('name', attrs.get('property', ''))
+            content = attrs.get('content', '')
+
+            if published_time is None and (
+                    attrs.get('property', '').lower() in _DATE_PROPERTIES
+                    or attrs.get('name', '').lower() == 'publication_date'):
+                published_time = attrs.get('content')
 
             if name and content:
                 name = name.lower()
 
                 # Extract common metadata
-                if name in ['description', 'keywords', 'author', 'robots']:
+                if name in _META_KEYS:
                     metadata[name] = content
                 # Extract OpenGraph metadata
                 elif name.startswith('og:'):
-                    og_key = name[3:]
-                    if 'opengraph' not in metadata:
-                        metadata['opengraph'] = {}
-                    metadata['opengraph'][og_key] = content
+                    metadata.setdefault('opengraph', {})[name[3:]] = content
                 # Extract Twitter metadata
                 elif name.startswith('twitter:'):
-                    twitter_key = name[8:]
-                    if 'twitter' not in metadata:
-                        metadata['twitter'] = {}
-                    metadata['twitter'][twitter_key] = content
+                    metadata.setdefault('twitter', {})[name[8:]] = content
 
         # Extract canonical URL
-        canonical = soup.find('link', rel='canonical')
-        if canonical and canonical.get('href'):
-            metadata['canonical_url'] = canonical['href']
+        for link in tree.iter('link'):
+            if 'canonical' in link.get('rel', '').split():
+                if link.get('href'):
+                    metadata['canonical_url'] = link.get('href')
+                break
 
         # Extract language
-        html_tag = soup.find('html')
-        if html_tag and html_tag.get('lang'):
-            metadata['language'] = html_tag['lang']
-
-        # Extract published date
-        published_time = None
-
-        # Try various meta tags for publication date
-        for meta in soup.find_all('meta'):
-            property_attr = meta.get('property', '').lower()
-            name_attr = meta.get('name', '').lower()
-            if property_attr in ['article:published_time', 'og:published_time'] or name_attr == 'publication_date':
-                published_time = meta.get('content')
-                break
+        if tree.get('lang'):
+            metadata['language'] = tree.get('lang')
 
         # Try common date markup patterns
         if not published_time:
-            time_tag = soup.find('time')
-            if time_tag and time_tag.get('datetime'):
-                published_time = time_tag['datetime']
+            time_tag = tree.find('.//time[@datetime]')
+            if time_tag is not None and time_tag.get('datetime'):
+                published_time = time_tag.get('datetime')
 
         if published_time:
             metadata['published_date'] = published_time
@@ -204,68 +313,113 @@ class EnhancedHTMLContentExtractor:
 
     def combine_content(self, structured_content: Dict[str, Any]) -> str:
         """Combine structured content into a single text."""
-        text_parts = []
-
         # Add headings
-        for heading in structured_content.get("headings", []):
-            text_parts.append(f"{'#' * heading['level']} {heading['text']}")
+        text_parts = [f"{_HEADING_PREFIXES[heading['level']]} {heading['text']}"
+                      for heading in structured_content.get("headings", [])]
 
         # Add paragraphs
-        for paragraph in structured_content.get("paragraphs", []):
-            text_parts.append(paragraph)
+        text_parts.extend(structured_content.get("paragraphs", []))
 
-        # Add lists
+        # Add lists, choosing the item prefix once per list rather than per item
         for list_data in structured_content.get("lists", []):
-            for i, item in enumerate(list_data["items"]):
-                prefix = "- " if list_data["type"] == "ul" else f"{i + 1}. "
-                text_parts.append(f"{prefix}{item}")
+            items = list_data["items"]
+            if list_data["type"] == "ul":
+                text_parts.extend(["- " + item for item in items])
+            else:
+                text_parts.extend([f"{i}. {item}" for i, item in enumerate(items, 1)])
 
         return "\n\n".join(text_parts)
 
-    async def extract_from_url(self, url: str, delay: float = 1.0) -> Dict[str, Any]:
+    async def extract_from_url(self, url: str, delay: float = 1.0,
+                               session: Optional[aiohttp.ClientSession] = None) -> Dict[str, Any]:
         """Extract content from a specific URL."""
-        async with aiohttp.ClientSession() as session:
-            html = await self.fetch_url(url, session, delay)
-            if not html:
-                return {"url": url, "error": "Failed to fetch content"}
-
-            # Extract basic content
-            cleaned_html = self.remove_boilerplate(html)
-            structured_content = self.extract_structured_content(cleaned_html)
-            metadata = self.extract_metadata(html, url)
-
-            # Combine content into a single text
-            text = self.combine_content(structured_content)
-            clean_text = self.clean_text(text)
-
-            return {
-                "url": url,
-                "title": metadata.get("title", ""),
-                "metadata": metadata,
-                "text": clean_text,
-                "structured_content": structured_content,
-                "raw_html": html if metadata.get("keep_raw_html", False) else None
-            }
+        html = await self.fetch_url(url, session, delay)
+        if not html:
+            return {"url": url, "error": "Failed to fetch content"}
+
+        key = hashlib.blake2b(html.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        cached = self._extract_cache.get(key)
+        if cached is not None:
+            self._extract_cache.move_to_end(key)
+            # Same page under another URL: reuse the extraction, but report this URL
+            result = copy.deepcopy(cached)
+            result["url"] = url
+            result["metadata"]["url"] = url
+            result["metadata"]["domain"] = netloc(url)
+            return result
+
+        result = await self._run_extraction(html, url)
+        if "error" in result:
+            return result
+
+        self._extract_cache[key] = result
+        if len(self._extract_cache) > self.extract_cache_size:
+            self._extract_cache.popitem(last=False)
+        return result
+
+    async def _run_extraction(self, html: str, url: str) -> Dict[str, Any]:
+        """Run extract_from_html off the event loop: in the process pool if enabled, else a thread."""
+        if self.use_process_pool:
+            try:
+                return await run_in_process_pool(_extract_page, type(self), html, url)
+            except asyncio.TimeoutError:
+                logger.error(f"Timed out extracting content from {url}")
+                return {"url": url, "error": "Timed out extracting content"}
+            except Exception as e:
+                # E.g. a broken pool, or no child processes allowed in this environment
+                logger.warning(f"Process pool unavailable, extracting in-process instead: {str(e)}")
+                self.use_process_pool = False
+
+        # Without worker processes, still keep the CPU-bound extraction off the event loop's thread
+        return await asyncio.to_thread(self.extract_from_html, html, url)
+
+    def extract_from_html(self, html: str, url: str) -> Dict[str, Any]:
+        """Extract content and metadata from an already fetched page."""
+        # Parse the page once; boilerplate removal and metadata both read this tree
+        tree = _parse_html(html)
+
+        # Extract basic content
+        cleaned_html = self.remove_boilerplate(html, tree)
+        structured_content = self.extract_structured_content(cleaned_html)
+        metadata = self.extract_metadata(tree if tree is not None else html, url)
+
+        # Combine content into a single text
+        text = self.combine_content(structured_content)
+        clean_text = self.clean_text(text)
+
+        return {
+            "url": url,
+            "title": metadata.get("title", ""),
+            "metadata": metadata,
+            "text": clean_text,
+            "structured_content": structured_content,
+            "raw_html": html if metadata.get("keep_raw_html", False) else None
+        }
+
+    async def extract_from_url_json(self, url: str, delay: float = 1.0) -> bytes:
+        """Extract content from a URL and return the result serialized as UTF-8 JSON."""
+        result = await self.extract_from_url(url, delay)
+        return orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS)
 
     async def extract_from_urls(self, urls: List[str], delay: float = 1.0) -> List[Dict[str, Any]]:
         """Extract content from multiple URLs in parallel, with rate limiting."""
-        async with aiohttp.ClientSession() as session:
-            tasks = []
+        session = await self._get_session()
+        tasks = []
 
-            for url in urls:
-                tasks.append(self.extract_from_url(url, delay))
+        for url in urls:
+            tasks.append(self.extract_from_url(url, delay, session))
 
-            results = await asyncio.gather(*tasks)
-            return results
+        results = await asyncio.gather(*tasks)
+        return results
 
 
 # Example usage
 async def main():
-    extractor = EnhancedHTMLContentExtractor()
-    content = await extractor.extract_from_url("https://example.com")
+    async with EnhancedHTMLContentExtractor() as extractor:
+        content = await extractor.extract_from_url("https://example.com")
     print(f"Title: {content['title']}")
     print(f"Text length: {len(content['text'])} characters")
-    print(f"Metadata: {json.dumps(content['metadata'], indent=2)}")
+    print(f"Metadata: {orjson.dumps(content['metadata'], option=orjson.OPT_INDENT_2).decode()}")
     print("\nContent sample:")
     print(content['text'][:500] + "..." if len(content['text']) > 500 else content['text'])
 
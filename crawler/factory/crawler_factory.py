@@ -1,89 +1,123 @@
 import logging
 import asyncio
+import re
 import aiohttp
 from typing import Dict, Any, List, Optional, Union
 from bs4 import BeautifulSoup
+import soupsieve as sv
 from urllib.parse import urlparse
 
 from crawler.crawler.sitemap_crawler import EnhancedSitemapCrawler
 from crawler.domain.domain_crawler import get_domain_crawler, DomainCrawler
 from crawler.robots.robots_parser import RobotsParser
+from crawler.utils.helpers import browser_headers
 
 logger = logging.getLogger(__name__)
 
+# URL path markers per website type, checked in this order; like the substring checks
+# they replace, they match anywhere in the path (so '/blogs' and '/api-v2' count too)
+_PATH_TYPE_PATTERNS = (
+    (re.compile(r'/(?:blog|post|article|news)'), "blog"),
+    (re.compile(r'/(?:docs|documentation|guide|tutorial|reference|api)'), "documentation"),
+    (re.compile(r'/(?:products?|shop|store|category)'), "ecommerce"),
+)
+
+# Page markup indicators per website type, each group joined into one selector so a
+# single select_one() call answers "does any of them match?", and compiled once so
+# soupsieve doesn't re-parse the selector for every page
+_ECOMMERCE_SELECTOR = sv.compile(", ".join([
+    '.products', '.product-list', '.cart', '.shop',
+    'form[action*="cart"]', 'button[name*="add"]',
+    'input[name*="add_to_cart"]'
+]))
+_DOC_SELECTOR = sv.compile(", ".join([
+    '.documentation', '.docs', '.markdown-body', '.doc-content',
+    'nav.toc', '.sidebar'
+]))
+_BLOG_SELECTOR = sv.compile(", ".join([
+    '.blog', '.post', '.article', '.entry',
+    'article', '.post-content', '.blog-post'
+]))
+
+
+def _decode_body(body: bytes, charset: Optional[str]) -> str:
+    """Decode a response body with its declared charset, falling back to UTF-8."""
+    try:
+        return body.decode(charset or 'utf-8', errors='replace')
+    except LookupError:
+        # Unknown charset name in the Content-Type header
+        return body.decode('utf-8', errors='replace')
+
+
+def _classify_markup(html: str) -> Optional[str]:
+    """Return the website type the page's markup points to, or None if it shows no indicator."""
+    soup = BeautifulSoup(html, 'lxml')
+
+    # Check for e-commerce indicators
+    if _ECOMMERCE_SELECTOR.select_one(soup) is not None:
+        return "ecommerce"
+
+    # Check for documentation indicators
+    if _DOC_SELECTOR.select_one(soup) is not None:
+        return "documentation"
+
+    # Check for blog indicators
+    if _BLOG_SELECTOR.select_one(soup) is not None:
+        return "blog"
+
+    # Check meta tags
+    meta_tags = soup.find_all('meta')
+    for meta in meta_tags:
+        if meta.get('property') == 'og:type':
+            og_type = meta.get('content', '').lower()
+            if og_type in ['product', 'product.item']:
+                return "ecommerce"
+            elif og_type in ['article', 'blog']:
+                return "blog"
+
+    return None
+
 
 class CrawlerFactory:
     """Factory class to create appropriate crawlers for websites."""
 
     @staticmethod
-    async def detect_website_type(url: str, user_agent: str = "RAGCrawler") -> str:
-        """Detect the type of website to determine the best crawler to use."""
+    async def detect_website_type(url: str, user_agent: str = "RAGCrawler",
+                                  session: Optional[aiohttp.ClientSession] = None) -> str:
+        """Detect the type of website to determine the best crawler to use.
+
+        Pass an existing ``session`` to reuse its connection pool; otherwise a
+        short-lived one is opened for this request.
+        """
         try:
             # Parse URL
             parsed_url = urlparse(url)
             path = parsed_url.path.lower()
 
             # First, check URL patterns
-            if any(pattern in path for pattern in ['/blog', '/post', '/article', '/news']):
-                return "blog"
-            elif any(pattern in path for pattern in
-                     ['/docs', '/documentation', '/guide', '/tutorial', '/reference', '/api']):
-                return "documentation"
-            elif any(pattern in path for pattern in ['/product', '/products', '/shop', '/store', '/category']):
-                return "ecommerce"
+            for pattern, website_type in _PATH_TYPE_PATTERNS:
+                if pattern.search(path):
+                    return website_type
 
             # If URL doesn't give clear indication, fetch and analyze the main page
-            headers = {
-                "User-Agent": f"{user_agent}/1.0",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-                "Accept-Language": "en-US,en;q=0.5",
-                "Accept-Encoding": "gzip, deflate, br",
-                "Connection": "keep-alive"
-            }
-
-            async with aiohttp.ClientSession() as session:
+            headers = browser_headers(user_agent)
+
+            owns_session = session is None
+            if owns_session:
+                session = aiohttp.ClientSession()
+            try:
                 async with session.get(url, headers=headers) as response:
                     if response.status == 200:
-                        html = await response.text()
-                        soup = BeautifulSoup(html, 'lxml')
-
-                        # Check for e-commerce indicators
-                        ecommerce_indicators = [
-                            '.products', '.product-list', '.cart', '.shop',
-                            'form[action*="cart"]', 'button[name*="add"]',
-                            'input[name*="add_to_cart"]'
-                        ]
-                        for indicator in ecommerce_indicators:
-                            if soup.select(indicator):
-                                return "ecommerce"
-
-                        # Check for documentation indicators
-                        doc_indicators = [
-                            '.documentation', '.docs', '.markdown-body', '.doc-content',
-                            'nav.toc', '.sidebar'
-                        ]
-                        for indicator in doc_indicators:
-                            if soup.select(indicator):
-                                return "documentation"
-
-                        # Check for blog indicators
-                        blog_indicators = [
-                            '.blog', '.post', '.article', '.entry',
-                            'article', '.post-content', '.blog-post'
-                        ]
-                        for indicator in blog_indicators:
-                            if soup.select(indicator):
-                                return "blog"
-
-                        # Check meta tags
-                        meta_tags = soup.find_all('meta')
-                        for meta in meta_tags:
-                            if meta.get('property') == 'og:type':
-                                og_type = meta.get('content', '').lower()
-                                if og_type in ['product', 'product.item']:
-                                    return "ecommerce"
-                                elif og_type in ['article', 'blog']:
-                                    return "blog"
+                        # Decode with the declared charset instead of response.text(), which
+                        # runs charset detection over the whole body when the header has none
+                        body = await response.read()
+                        website_type = _classify_markup(_decode_body(body, response.charset))
+
+                        if website_type is not None:
+                            return website_type
+            finally:
+                if owns_session:
+                    await session.close()
 
             # Default to a generic website if we can't determine the type
             return "generic"
@@ -102,10 +136,11 @@ class CrawlerFactory:
 
     @staticmethod
     async def create_domain_crawler(url: str, website_type: Optional[str] = None,
-                                    user_agent: str = "RAGCrawler") -> DomainCrawler:
+                                    user_agent: str = "RAGCrawler",
+                                    session: Optional[aiohttp.ClientSession] = None) -> DomainCrawler:
         """Create a domain-specific crawler for content extraction."""
         if website_type is None:
-            website_type = await CrawlerFactory.detect_website_type(url, user_agent)
+            website_type = await CrawlerFactory.detect_website_type(url, user_agent, session)
 
         return get_domain_crawler(url, user_agent)
 
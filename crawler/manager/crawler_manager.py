@@ -1,24 +1,58 @@
 import asyncio
+import hashlib
 import logging
 import time
-import json
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, List, Any, Optional, Set
 import os
 import aiofiles
+import aiohttp
+import orjson
 from sqlalchemy.orm import Session
 import uuid
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 from crawler.crawler.sitemap_crawler import EnhancedSitemapCrawler
 from crawler.extractor.html_extractor import EnhancedHTMLContentExtractor
+from crawler.utils.helpers import create_session
+from crawler.utils.process_pool import shutdown_process_pool
+
+try:
+    from app.core.database import SessionLocal
+    from app.models.page import Page
+    from app.repositories.page import PageRepository
+except ImportError:
+    # Running standalone, without the backend on the path: pages are only saved to disk
+    SessionLocal = None
+    Page = None
+    PageRepository = None
 
 logger = logging.getLogger(__name__)
 
 
+def _url_key(url: str) -> str:
+    """Stable key for a URL: a 16-byte blake2b hex digest, whose first byte picks its content shard."""
+    return hashlib.blake2b(url.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _ends_mid_line(path: str) -> bool:
+    """Whether a file exists and its last line is missing its newline (e.g. torn by a crash)."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+    except OSError:
+        # Missing or empty
+        return False
+
+
 class CrawlerJob:
     """Represents a crawling job for a website."""
 
+    # Fixed attribute set: smaller instances when the manager holds thousands of jobs
+    __slots__ = ("id", "website_id", "website_url", "sitemap_url", "status", "start_time", "end_time",
+                 "total_urls", "processed_urls", "successful_urls", "failed_urls", "errors")
+
     def __init__(self, website_id: int, website_url: str, sitemap_url: Optional[str] = None):
         self.id = str(uuid.uuid4())
         self.website_id = website_id
@@ -51,6 +85,27 @@ class CrawlerJob:
             "progress": round((self.processed_urls / self.total_urls) * 100, 2) if self.total_urls > 0 else 0
         }
 
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CrawlerJob":
+        """Rebuild a job from its ``to_dict`` form."""
+        # Skip __init__: every field is overwritten, so generating a fresh UUID would be wasted
+        job = cls.__new__(cls)
+        job.id = data["id"]
+        job.website_id = data["website_id"]
+        job.website_url = data["website_url"]
+        job.sitemap_url = data["sitemap_url"]
+        job.status = data["status"]
+        start_time = data["start_time"]
+        job.start_time = datetime.fromisoformat(start_time) if start_time else None
+        end_time = data["end_time"]
+        job.end_time = datetime.fromisoformat(end_time) if end_time else None
+        job.total_urls = data["total_urls"]
+        job.processed_urls = data["processed_urls"]
+        job.successful_urls = data["successful_urls"]
+        job.failed_urls = data["failed_urls"]
+        job.errors = data["errors"]
+        return job
+
 
 class CrawlerManager:
     """Manages crawling jobs and their execution."""
@@ -62,12 +117,41 @@ class CrawlerManager:
         self.storage_dir = storage_dir
         self.user_agent = "RAGCrawlerBot/1.0"
         self.default_crawl_delay = 1.0  # seconds
+        self.per_job_concurrency = 10  # URLs extracted at once within a job
+        self.page_batch_size = 50  # pages upserted per database statement
+        self.metadata_save_interval = 0.5  # seconds between unforced job snapshots
+        self._last_save_ts: Dict[str, float] = {}
+        # Hash of the last snapshot written per job, to skip rewriting identical state
+        self._last_saved_hash: Dict[str, int] = {}
+        self._page_session_factory = SessionLocal
+        # HTTP session shared by every job's crawler, robots parser and extractor
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Serializes appends to each content shard within this process
+        self._shard_locks: Dict[str, asyncio.Lock] = {}
+        # Shard and key files checked for a torn last line since this process started
+        self._checked_shards: Set[str] = set()
+        # Per job: held across journal appends and across writing a snapshot and dropping
+        # the journal it covers, so no append lands between the two and is lost
+        self._journal_locks: Dict[str, asyncio.Lock] = {}
 
         # Create storage directory if it doesn't exist
         os.makedirs(self.storage_dir, exist_ok=True)
         os.makedirs(os.path.join(self.storage_dir, "jobs"), exist_ok=True)
         os.makedirs(os.path.join(self.storage_dir, "content"), exist_ok=True)
 
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the HTTP session shared across jobs, creating it on first use."""
+        if self._session is None or self._session.closed:
+            self._session = create_session(limit_per_host=8, keepalive_timeout=75)
+        return self._session
+
+    async def close(self) -> None:
+        """Close the shared HTTP session and stop the extraction worker processes."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        await asyncio.to_thread(shutdown_process_pool)
+
     def create_job(self, website_id: int, website_url: str, sitemap_url: Optional[str] = None) -> CrawlerJob:
         """Create a new crawling job."""
         job = CrawlerJob(website_id, website_url, sitemap_url)
@@ -112,7 +196,7 @@ class CrawlerManager:
         self.active_jobs.add(job_id)
 
         # Save updated job metadata
-        self._save_job_metadata(job)
+        await self._save_job_metadata_async(job, force=True)
 
         # Start job in background
         asyncio.create_task(self._run_job(job))
@@ -137,57 +221,28 @@ class CrawlerManager:
         self.active_jobs.remove(job_id)
 
         # Save updated job metadata
-        self._save_job_metadata(job)
+        await self._save_job_metadata_async(job, force=True)
 
         return True
 
     async def _run_job(self, job: CrawlerJob) -> None:
         """Run a crawling job."""
+        crawler = None
+        extractor = None
         try:
             logger.info(f"Starting job {job.id} for website {job.website_url}")
 
             # Create crawler and extractor
-            crawler = EnhancedSitemapCrawler(job.website_url, self.user_agent)
-            extractor = EnhancedHTMLContentExtractor(self.user_agent)
-
-            # Discover URLs
-            urls_data = await crawler.crawl()
-            urls = [url_data["url"] for url_data in urls_data]
-
-            job.total_urls = len(urls)
-            self._save_job_metadata(job)
+            session = await self._get_session()
+            crawler = EnhancedSitemapCrawler(job.website_url, self.user_agent, session=session,
+                                             robots_cache_dir=os.path.join(self.storage_dir, "robots"))
+            # Share the crawler's robots.txt cache so the extractor honours Crawl-delay for free
+            extractor = EnhancedHTMLContentExtractor(self.user_agent, session=session,
+                                                     robots_parser=crawler.robots_parser)
 
-            logger.info(f"Job {job.id}: Discovered {len(urls)} URLs")
-
-            # Process URLs in batches to control memory usage
-            batch_size = 10
-            for i in range(0, len(urls), batch_size):
-                if job.status != "running":
-                    logger.info(f"Job {job.id} was stopped")
-                    break
-
-                batch = urls[i:i + batch_size]
-                content_results = await extractor.extract_from_urls(batch, delay=self.default_crawl_delay)
-
-                for result in content_results:
-                    if job.status != "running":
-                        break
-
-                    url = result.get("url")
-
-                    if "error" in result:
-                        logger.warning(f"Failed to extract content from {url}: {result['error']}")
-                        job.failed_urls += 1
-                        job.errors.append(f"Failed to extract content from {url}: {result['error']}")
-                    else:
-                        # Save content to file
-                        await self._save_content(job.website_id, result)
-                        job.successful_urls += 1
-
-                    job.processed_urls += 1
-                    self._save_job_metadata(job)
-
-                logger.info(f"Job {job.id}: Processed {job.processed_urls}/{job.total_urls} URLs")
+            # Discover URLs and extract them as they are found
+            job.total_urls = 0
+            await self._process_urls(job, crawler, extractor)
 
             # Update job status
             if job.status == "running":
@@ -204,77 +259,353 @@ class CrawlerManager:
             job.errors.append(str(e))
 
         finally:
+            if extractor is not None:
+                await extractor.close()
+
+            if crawler is not None:
+                # The extractor checks robots.txt through the crawler's parser, which
+                # may have reopened its session after discovery finished
+                await crawler.close()
+
             if job.id in self.active_jobs:
                 self.active_jobs.remove(job.id)
 
-            self._save_job_metadata(job)
+            await self._save_job_metadata_async(job, force=True)
+            self._last_save_ts.pop(job.id, None)
+            self._last_saved_hash.pop(job.id, None)
+            self._journal_locks.pop(job.id, None)
+
+    async def _process_urls(self, job: CrawlerJob, crawler: EnhancedSitemapCrawler,
+                            extractor: EnhancedHTMLContentExtractor,
+                            skip_keys: Optional[Set[str]] = None) -> None:
+        """Discover the site's URLs and extract them while discovery is still running.
+
+        The crawler feeds URLs into a bounded queue as it finds them, and
+        ``per_job_concurrency`` workers extract and save them, so a slow page
+        only holds its own worker. URLs whose key is in ``skip_keys`` are
+        left out. ``job.total_urls`` grows as URLs are queued.
+        """
+        # Bounded so discovery cannot run arbitrarily far ahead of extraction
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.per_job_concurrency * 10)
+        # One database session for the whole job rather than one per page
+        db = self._page_session_factory() if self._page_session_factory is not None else None
+        # Pages waiting to be upserted, keyed by URL so one statement never touches a row twice
+        pending_pages: Dict[str, Dict[str, Any]] = {}
+
+        async def enqueue(url_data: Dict[str, Any]) -> None:
+            url = url_data["url"]
+            if job.status != "running" or (skip_keys is not None and _url_key(url) in skip_keys):
+                return
+            job.total_urls += 1
+            await queue.put(url)
+
+        async def handle_result(url: str, result: Dict[str, Any]) -> None:
+            if "error" in result:
+                logger.warning(f"Failed to extract content from {url}: {result['error']}")
+                job.failed_urls += 1
+                job.errors.append(f"Failed to extract content from {url}: {result['error']}")
+            else:
+                # Save content to file
+                await self._save_content(job.website_id, result)
+                job.successful_urls += 1
+
+                if db is not None:
+                    pending_pages[url] = self._page_row(job.website_id, result)
+                    if len(pending_pages) >= self.page_batch_size:
+                        self._flush_pages(db, pending_pages)
+
+            job.processed_urls += 1
+            await self._append_progress(job, url, result.get("error"))
+            await self._save_job_metadata_async(job)
+
+            if job.processed_urls % self.per_job_concurrency == 0:
+                logger.info(f"Job {job.id}: Processed {job.processed_urls}/{job.total_urls} URLs")
+
+        async def worker() -> None:
+            while True:
+                url = await queue.get()
+                try:
+                    # Once the job stops, just drain the queue
+                    if job.status != "running":
+                        continue
+                    try:
+                        result = await extractor.extract_from_url(url, delay=self.default_crawl_delay)
+                    except Exception as e:
+                        result = {"url": url, "error": str(e)}
+                    if job.status == "running":
+                        await handle_result(url, result)
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.per_job_concurrency)]
+        try:
+            await crawler.crawl(on_url=enqueue)
+            logger.info(f"Job {job.id}: Discovery finished with {job.total_urls} URLs in total")
+            await self._save_job_metadata_async(job, force=True)
+
+            await queue.join()
+            if job.status != "running":
+                logger.info(f"Job {job.id} was stopped")
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+            if db is not None:
+                try:
+                    self._flush_pages(db, pending_pages)
+                finally:
+                    db.close()
 
     def _save_job_metadata(self, job: CrawlerJob) -> None:
         """Save job metadata to disk."""
         try:
             job_path = os.path.join(self.storage_dir, "jobs", f"{job.id}.json")
-            with open(job_path, "w") as f:
-                json.dump(job.to_dict(), f, indent=2)
+            with open(job_path, "wb") as f:
+                f.write(orjson.dumps(job.to_dict()))
+
+            self._drop_progress_journal(job)
+        except Exception as e:
+            logger.error(f"Error saving job metadata: {str(e)}")
+
+    async def _save_job_metadata_async(self, job: CrawlerJob, force: bool = False) -> None:
+        """Save job metadata to disk without blocking the event loop.
+
+        Unforced saves are skipped if the previous snapshot is less than
+        ``metadata_save_interval`` seconds old; the progress journal keeps
+        those updates on disk in the meantime. Pass ``force=True`` on status
+        transitions. A snapshot identical to the last one written is never
+        rewritten.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_save_ts.get(job.id, 0.0) < self.metadata_save_interval:
+            return
+        self._last_save_ts[job.id] = now
+
+        try:
+            job_path = os.path.join(self.storage_dir, "jobs", f"{job.id}.json")
+            async with self._journal_locks.setdefault(job.id, asyncio.Lock()):
+                data = orjson.dumps(job.to_dict())
+                data_hash = hash(data)
+                if self._last_saved_hash.get(job.id) == data_hash:
+                    return
+
+                async with aiofiles.open(job_path, "wb") as f:
+                    await f.write(data)
+                self._last_saved_hash[job.id] = data_hash
+
+                self._drop_progress_journal(job)
         except Exception as e:
             logger.error(f"Error saving job metadata: {str(e)}")
 
+    def _drop_progress_journal(self, job: CrawlerJob) -> None:
+        """Remove the progress journal once a snapshot covers it."""
+        journal_path = os.path.join(self.storage_dir, "jobs", f"{job.id}.jsonl")
+        if os.path.exists(journal_path):
+            os.remove(journal_path)
+
+    async def _append_progress(self, job: CrawlerJob, url: str, error: Optional[str] = None) -> None:
+        """Append one processed URL to the job's progress journal.
+
+        Each line carries the job counters after the URL was processed, so
+        replaying the journal on top of an older snapshot is idempotent.
+        """
+        event = {
+            "url": url,
+            "status": "error" if error else "ok",
+            "processed_urls": job.processed_urls,
+            "successful_urls": job.successful_urls,
+            "failed_urls": job.failed_urls,
+        }
+        if error:
+            event["error"] = f"Failed to extract content from {url}: {error}"
+
+        try:
+            journal_path = os.path.join(self.storage_dir, "jobs", f"{job.id}.jsonl")
+            async with self._journal_locks.setdefault(job.id, asyncio.Lock()):
+                async with aiofiles.open(journal_path, "ab") as f:
+                    await f.write(orjson.dumps(event, option=orjson.OPT_APPEND_NEWLINE))
+        except Exception as e:
+            logger.error(f"Error appending job progress: {str(e)}")
+
+    def _replay_progress(self, job: CrawlerJob, journal_path: str) -> None:
+        """Apply progress journal entries newer than the job's snapshot."""
+        with open(journal_path, "rb") as f:
+            for line in f:
+                try:
+                    event = orjson.loads(line)
+                except ValueError:
+                    # A torn last line from a crash mid-append
+                    continue
+
+                if event["processed_urls"] <= job.processed_urls:
+                    continue
+
+                job.processed_urls = event["processed_urls"]
+                job.successful_urls = event["successful_urls"]
+                job.failed_urls = event["failed_urls"]
+                if "error" in event:
+                    job.errors.append(event["error"])
+
     async def _save_content(self, website_id: int, content: Dict[str, Any]) -> None:
-        """Save extracted content to disk and update database if available."""
+        """Append extracted content to the website's content store.
+
+        Pages go into 256 append-only shards, ``<key[:2]>.jsonl``, one JSON
+        line per page; the URL keys are appended to a matching ``.keys`` file
+        so resuming a job does not have to read the pages back. A page that is
+        crawled again gets a new line, and readers keep the last one per URL.
+        """
         try:
             # Create folder for website if it doesn't exist
             website_dir = os.path.join(self.storage_dir, "content", str(website_id))
             os.makedirs(website_dir, exist_ok=True)
 
-            # Generate a filename based on the URL
+            # Pick the shard from the URL key; unlike hash(), blake2b is stable across runs
             url = content["url"]
-            filename = f"{hash(url)}.json"
-            file_path = os.path.join(website_dir, filename)
-
-            # Save content to file
-            async with aiofiles.open(file_path, "w") as f:
-                await f.write(json.dumps(content, indent=2))
-
-            # Update database if possible
-            try:
-                # Import needed only when called
-                from sqlalchemy.orm import Session
-                from app.core.database import SessionLocal
-                from app.repositories.page import PageRepository
-
-                # Create session
-                db = SessionLocal()
-                try:
-                    page_repo = PageRepository(db)
-
-                    # Check if page exists
-                    page = page_repo.get_by_url(url)
-
-                    if page:
-                        # Update existing page
-                        page_repo.update(page.id, {
-                            "title": content.get("title"),
-                            "content": content.get("content"),
-                            "last_crawled_at": datetime.now().isoformat()
-                        })
-                    else:
-                        # Create new page
-                        page_repo.create({
-                            "url": url,
-                            "title": content.get("title"),
-                            "content": content.get("content"),
-                            "website_id": website_id,
-                            "last_crawled_at": datetime.now().isoformat(),
-                            "is_indexed": False
-                        })
-                finally:
-                    db.close()
-            except Exception as db_error:
-                # Log error but continue - this is just an enhancement
-                logger.error(f"Error updating page in database: {str(db_error)}")
+            key = _url_key(url)
+            shard_path = os.path.join(website_dir, f"{key[:2]}.jsonl")
+            keys_path = os.path.join(website_dir, f"{key[:2]}.keys")
+
+            # Compact orjson output: these files are only read back by code
+            record = orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+
+            lock = self._shard_locks.setdefault(shard_path, asyncio.Lock())
+            async with lock:
+                await self._append_line(shard_path, record)
+                # Only once the page itself is stored, so resuming never skips a lost page
+                await self._append_line(keys_path, f"{key}\n".encode())
 
         except Exception as e:
             logger.error(f"Error saving content: {str(e)}")
 
+    async def _append_line(self, path: str, line: bytes) -> None:
+        """Append a newline-terminated line to a file.
+
+        A crash can leave a partial last line behind; the first append to a file in
+        this process ends that line first, so the new line doesn't run into it.
+        """
+        if path not in self._checked_shards:
+            if await asyncio.to_thread(_ends_mid_line, path):
+                line = b"\n" + line
+            self._checked_shards.add(path)
+
+        try:
+            async with aiofiles.open(path, "ab") as f:
+                await f.write(line)
+        except Exception:
+            # The write may have stopped mid-line; check the file again next time
+            self._checked_shards.discard(path)
+            raise
+
+    @staticmethod
+    def _stored_url_keys(website_dir: str) -> Set[str]:
+        """Return the keys of every URL saved in a website's content directory."""
+        keys: Set[str] = set()
+        if not os.path.exists(website_dir):
+            return keys
+
+        with os.scandir(website_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".keys"):
+                    with open(entry.path, "r") as f:
+                        keys.update(line.rstrip("\n") for line in f)
+                elif entry.name.endswith(".json"):
+                    # One file per page, named by URL key, from before content was sharded
+                    keys.add(entry.name[:-5])
+        return keys
+
+    @staticmethod
+    def _page_row(website_id: int, content: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the pages table row for extracted content."""
+        now = datetime.now(timezone.utc)
+        return {
+            "url": content["url"],
+            "title": content.get("title"),
+            "content": content.get("content"),
+            "website_id": website_id,
+            "last_crawled_at": datetime.now().isoformat(),
+            "is_indexed": False,
+            "created_at": now,
+            "updated_at": now
+        }
+
+    def _flush_pages(self, db: Session, pending_pages: Dict[str, Dict[str, Any]]) -> None:
+        """Upsert pending pages in one INSERT ... ON CONFLICT (url) statement and commit once.
+
+        Pages that already exist get their title, content and crawl time
+        refreshed; their website and indexing state are left alone. Databases
+        other than PostgreSQL and SQLite are updated one page at a time.
+        """
+        if not pending_pages:
+            return
+
+        try:
+            dialect = db.get_bind().dialect.name
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            elif dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                self._flush_pages_per_row(db, pending_pages)
+                return
+
+            stmt = insert(Page.__table__).values(list(pending_pages.values()))
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["url"],
+                set_={
+                    "title": stmt.excluded.title,
+                    "content": stmt.excluded.content,
+                    "last_crawled_at": stmt.excluded.last_crawled_at,
+                    "updated_at": stmt.excluded.updated_at
+                }
+            )
+            db.execute(stmt)
+            db.commit()
+        except Exception as db_error:
+            # Log error but continue - this is just an enhancement
+            db.rollback()
+            logger.error(f"Error updating pages in database: {str(db_error)}")
+        finally:
+            pending_pages.clear()
+
+    @staticmethod
+    def _flush_pages_per_row(db: Session, pending_pages: Dict[str, Dict[str, Any]]) -> None:
+        """Save pending pages through PageRepository, looking each one up by URL first."""
+        page_repo = PageRepository(db)
+        for url, row in pending_pages.items():
+            page = page_repo.get_by_url(url)
+            if page:
+                page_repo.update(page.id, {
+                    "title": row["title"],
+                    "content": row["content"],
+                    "last_crawled_at": row["last_crawled_at"]
+                })
+            else:
+                page_repo.create({
+                    "url": url,
+                    "title": row["title"],
+                    "content": row["content"],
+                    "website_id": row["website_id"],
+                    "last_crawled_at": row["last_crawled_at"],
+                    "is_indexed": False
+                })
+
+    def _load_job_file(self, path: str) -> Optional[CrawlerJob]:
+        """Load one job snapshot and replay its progress journal; None if the file is unreadable."""
+        try:
+            with open(path, "rb") as f:
+                job = CrawlerJob.from_dict(orjson.loads(f.read()))
+
+            # Pick up progress recorded after the last snapshot
+            journal_path = os.path.join(os.path.dirname(path), f"{job.id}.jsonl")
+            if os.path.exists(journal_path):
+                self._replay_progress(job, journal_path)
+
+            return job
+        except Exception as e:
+            logger.error(f"Error loading job from {os.path.basename(path)}: {str(e)}")
+            return None
+
     def load_jobs(self) -> None:
         """Load saved jobs from disk."""
         try:
@@ -282,31 +613,17 @@ class CrawlerManager:
             if not os.path.exists(jobs_dir):
                 return
 
-            for filename in os.listdir(jobs_dir):
-                if filename.endswith(".json"):
-                    try:
-                        with open(os.path.join(jobs_dir, filename), "r") as f:
-                            job_data = json.load(f)
-                            job = CrawlerJob(
-                                website_id=job_data["website_id"],
-                                website_url=job_data["website_url"],
-                                sitemap_url=job_data["sitemap_url"]
-                            )
-                            job.id = job_data["id"]
-                            job.status = job_data["status"]
-                            job.start_time = datetime.fromisoformat(job_data["start_time"]) if job_data[
-                                "start_time"] else None
-                            job.end_time = datetime.fromisoformat(job_data["end_time"]) if job_data[
-                                "end_time"] else None
-                            job.total_urls = job_data["total_urls"]
-                            job.processed_urls = job_data["processed_urls"]
-                            job.successful_urls = job_data["successful_urls"]
-                            job.failed_urls = job_data["failed_urls"]
-                            job.errors = job_data["errors"]
-
-                            self.jobs[job.id] = job
-                    except Exception as e:
-                        logger.error(f"Error loading job from {filename}: {str(e)}")
+            with os.scandir(jobs_dir) as entries:
+                paths = [entry.path for entry in entries if entry.name.endswith(".json")]
+
+            if not paths:
+                return
+
+            # Overlap the file reads; jobs are independent of each other
+            with ThreadPoolExecutor(max_workers=min(16, len(paths))) as executor:
+                for job in executor.map(self._load_job_file, paths):
+                    if job is not None:
+                        self.jobs[job.id] = job
 
         except Exception as e:
             logger.error(f"Error loading jobs: {str(e)}")
@@ -332,7 +649,7 @@ class CrawlerManager:
         self.active_jobs.add(job_id)
 
         # Save updated job metadata
-        self._save_job_metadata(job)
+        await self._save_job_metadata_async(job, force=True)
 
         # Start job in background
         asyncio.create_task(self._resume_job(job))
@@ -341,69 +658,28 @@ class CrawlerManager:
 
     async def _resume_job(self, job: CrawlerJob) -> None:
         """Resume a job from where it left off."""
+        crawler = None
+        extractor = None
         try:
             logger.info(f"Resuming job {job.id} for website {job.website_url}")
 
             # Create crawler and extractor
-            crawler = EnhancedSitemapCrawler(job.website_url, self.user_agent)
-            extractor = EnhancedHTMLContentExtractor(self.user_agent)
+            session = await self._get_session()
+            crawler = EnhancedSitemapCrawler(job.website_url, self.user_agent, session=session,
+                                             robots_cache_dir=os.path.join(self.storage_dir, "robots"))
+            # Share the crawler's robots.txt cache so the extractor honours Crawl-delay for free
+            extractor = EnhancedHTMLContentExtractor(self.user_agent, session=session,
+                                                     robots_parser=crawler.robots_parser)
 
             # If we already have URL data, no need to re-crawl
             if job.total_urls > 0:
-                # Find already processed URLs
+                # Find already processed URLs from the shard key files, without reading the pages
                 website_dir = os.path.join(self.storage_dir, "content", str(job.website_id))
-                processed_urls = set()
-
-                if os.path.exists(website_dir):
-                    for filename in os.listdir(website_dir):
-                        if filename.endswith(".json"):
-                            try:
-                                with open(os.path.join(website_dir, filename), "r") as f:
-                                    content = json.load(f)
-                                    processed_urls.add(content["url"])
-                            except Exception as e:
-                                logger.error(f"Error loading content: {str(e)}")
-
-                # Re-crawl to get URLs
-                urls_data = await crawler.crawl()
-                urls = [url_data["url"] for url_data in urls_data if url_data["url"] not in processed_urls]
-
-                # Update job status
-                remaining_urls = len(urls)
-                job.total_urls = job.processed_urls + remaining_urls
-                self._save_job_metadata(job)
-
-                logger.info(f"Job {job.id}: Found {remaining_urls} new URLs to process")
-
-                # Process remaining URLs
-                batch_size = 10
-                for i in range(0, len(urls), batch_size):
-                    if job.status != "running":
-                        logger.info(f"Job {job.id} was stopped")
-                        break
-
-                    batch = urls[i:i + batch_size]
-                    content_results = await extractor.extract_from_urls(batch, delay=self.default_crawl_delay)
+                processed_urls = await asyncio.to_thread(self._stored_url_keys, website_dir)
 
-                    for result in content_results:
-                        if job.status != "running":
-                            break
-
-                        url = result.get("url")
-
-                        if "error" in result:
-                            logger.warning(f"Failed to extract content from {url}: {result['error']}")
-                            job.failed_urls += 1
-                            job.errors.append(f"Failed to extract content from {url}: {result['error']}")
-                        else:
-                            # Save content to file
-                            await self._save_content(job.website_id, result)
-                            job.successful_urls += 1
-
-                        job.processed_urls += 1
-                        self._save_job_metadata(job)
-
-                    logger.info(f"Job {job.id}: Processed {job.processed_urls}/{job.total_urls} URLs")
+                # Re-crawl to get URLs, extracting the ones not processed yet as they are found
+                job.total_urls = job.processed_urls
+                await self._process_urls(job, crawler, extractor, skip_keys=processed_urls)
 
             else:
                 # This should rarely happen, but handle it just in case
@@ -425,10 +701,21 @@ class CrawlerManager:
             job.errors.append(str(e))
 
         finally:
+            if extractor is not None:
+                await extractor.close()
+
+            if crawler is not None:
+                # The extractor checks robots.txt through the crawler's parser, which
+                # may have reopened its session after discovery finished
+                await crawler.close()
+
             if job.id in self.active_jobs:
                 self.active_jobs.remove(job.id)
 
-            self._save_job_metadata(job)
+            await self._save_job_metadata_async(job, force=True)
+            self._last_save_ts.pop(job.id, None)
+            self._last_saved_hash.pop(job.id, None)
+            self._journal_locks.pop(job.id, None)
 
 
 
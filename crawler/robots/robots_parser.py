@@ -1,17 +1,51 @@
 import aiohttp
+import asyncio
+import json
 import logging
-from typing import Dict, List, Optional, Set
+import os
+import re
+import time
+from typing import Callable, Dict, List, Optional, Pattern, Set, Tuple
 from urllib.parse import urlparse, urljoin
 
+from crawler.utils.helpers import create_session
+
 logger = logging.getLogger(__name__)
 
+# One match per directive line we act on: (directive, value up to any comment)
+_DIRECTIVE_RE = re.compile(r'^[ \t]*(user-agent|disallow|allow|crawl-delay)[ \t]*:([^#\r\n]*)',
+                           re.IGNORECASE | re.MULTILINE)
+
 
 class RobotsParser:
     """Parser for robots.txt files to ensure crawler compliance."""
 
-    def __init__(self, user_agent: str = "RAGCrawler"):
+    def __init__(self, user_agent: str = "RAGCrawler", session: Optional[aiohttp.ClientSession] = None,
+                 cache_dir: Optional[str] = None):
         self.user_agent = user_agent
         self.robots_cache: Dict[str, Dict[str, List[str]]] = {}
+        # One lock per host so concurrent checks fetch its robots.txt only once
+        self._host_locks: Dict[str, asyncio.Lock] = {}
+        # Path checkers built by get_host_matcher, keyed by scheme://netloc
+        self._host_matchers: Dict[str, Callable[[str], Tuple[bool, float]]] = {}
+        # Parsed rules are also kept on disk here (one file per host) when set
+        self.cache_dir = cache_dir
+        self.cache_ttl = 24 * 60 * 60  # seconds
+        self._session = session
+        self._owns_session = session is None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the session robots.txt files are fetched with, creating one on first use."""
+        if self._session is None or self._session.closed:
+            self._session = create_session()
+            self._owns_session = True
+        return self._session
+
+    async def close(self) -> None:
+        """Close the HTTP session if this parser created it."""
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
 
     async def fetch_robots_txt(self, base_url: str) -> Optional[str]:
         """Fetch the robots.txt file from a website."""
@@ -19,17 +53,51 @@ class RobotsParser:
             parsed_url = urlparse(base_url)
             robots_url = f"{parsed_url.scheme}://{parsed_url.netloc}/robots.txt"
 
-            async with aiohttp.ClientSession() as session:
-                async with session.get(robots_url) as response:
-                    if response.status == 200:
-                        return await response.text()
-                    else:
-                        logger.warning(f"Could not fetch robots.txt from {robots_url}: HTTP {response.status}")
-                        return None
+            session = await self._get_session()
+            async with session.get(robots_url) as response:
+                if response.status == 200:
+                    return await response.text()
+                else:
+                    logger.warning(f"Could not fetch robots.txt from {robots_url}: HTTP {response.status}")
+                    return None
         except Exception as e:
             logger.error(f"Error fetching robots.txt from {base_url}: {str(e)}")
             return None
 
+    def _cache_path(self, base_url: str) -> str:
+        # Keyed on scheme and host, since http:// and https:// may serve different robots.txt
+        parsed = urlparse(base_url)
+        return os.path.join(self.cache_dir, f"{parsed.scheme}_{parsed.netloc}".replace(':', '_') + ".json")
+
+    def _load_cached_rules(self, base_url: str) -> Optional[Dict[str, List[str]]]:
+        """Load parsed rules for a site from the disk cache if they are still fresh."""
+        if not self.cache_dir:
+            return None
+
+        path = self._cache_path(base_url)
+        try:
+            if time.time() - os.path.getmtime(path) >= self.cache_ttl:
+                return None
+            with open(path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not read cached robots.txt rules from {path}: {str(e)}")
+            return None
+
+    def _store_cached_rules(self, base_url: str, rules: Dict[str, List[str]]) -> None:
+        """Write parsed rules for a site to the disk cache."""
+        if not self.cache_dir:
+            return
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self._cache_path(base_url), "w") as f:
+                json.dump(rules, f)
+        except Exception as e:
+            logger.warning(f"Could not cache robots.txt rules for {base_url}: {str(e)}")
+
     def parse_robots_txt(self, robots_content: str) -> Dict[str, List[str]]:
         """Parse the robots.txt content into rules."""
         if not robots_content:
@@ -38,22 +106,9 @@ class RobotsParser:
         rules: Dict[str, List[str]] = {}
         current_agent = None
 
-        lines = robots_content.split("\n")
-        for line in lines:
-            # Remove comments
-            if "#" in line:
-                line = line[:line.index("#")]
-
-            line = line.strip()
-            if not line:
-                continue
-
-            parts = line.split(":", 1)
-            if len(parts) != 2:
-                continue
-
-            directive = parts[0].strip().lower()
-            value = parts[1].strip()
+        for directive, value in _DIRECTIVE_RE.findall(robots_content):
+            directive = directive.lower()
+            value = value.strip()
 
             if directive == "user-agent":
                 current_agent = value.lower()
@@ -94,6 +149,57 @@ class RobotsParser:
         # Default crawl delay
         return 1.0  # 1 second
 
+    async def _get_rules(self, base_url: str) -> Dict[str, List[str]]:
+        """Return the parsed rules for a host, from memory, the disk cache or a fresh fetch."""
+        # Check cache first
+        rules = self.robots_cache.get(base_url)
+        if rules is None:
+            lock = self._host_locks.setdefault(base_url, asyncio.Lock())
+            async with lock:
+                # Another check may have filled the cache while we waited
+                rules = self.robots_cache.get(base_url)
+                if rules is None:
+                    # The disk cache is plain file I/O, so keep it off the event loop
+                    rules = await asyncio.to_thread(self._load_cached_rules, base_url)
+                    if rules is None:
+                        robots_content = await self.fetch_robots_txt(base_url)
+                        rules = self.parse_robots_txt(robots_content)
+                        # Only persist real answers; a failed fetch should be retried next run
+                        if robots_content is not None:
+                            await asyncio.to_thread(self._store_cached_rules, base_url, rules)
+                    self.robots_cache[base_url] = rules
+        return rules
+
+    async def get_host_matcher(self, base_url: str) -> Callable[[str], Tuple[bool, float]]:
+        """
+        Return a checker for URL paths on one host (given as scheme://netloc).
+        The checker maps a path to (is_allowed, crawl_delay) without parsing
+        URLs or looking the host up again, for checking many URLs of one host.
+        """
+        matcher = self._host_matchers.get(base_url)
+        if matcher is not None:
+            return matcher
+
+        rules = await self._get_rules(base_url)
+        crawl_delay = self.get_crawl_delay(rules)
+        pattern = self._compile_disallow_rules(rules)
+
+        allowed = (True, crawl_delay)
+        disallowed = (False, crawl_delay)
+
+        if pattern is None:
+            def matcher(path: str) -> Tuple[bool, float]:
+                return allowed
+        else:
+            match = pattern.match
+
+            def matcher(path: str) -> Tuple[bool, float]:
+                # Check if the path matches any disallow rule
+                return disallowed if match(path) else allowed
+
+        self._host_matchers[base_url] = matcher
+        return matcher
+
     async def is_allowed(self, url: str) -> tuple[bool, float]:
         """
         Check if a URL is allowed to be crawled according to robots.txt rules.
@@ -101,20 +207,14 @@ class RobotsParser:
         """
         parsed_url = urlparse(url)
         base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-        path = parsed_url.path or "/"
 
-        # Check cache first
-        if base_url not in self.robots_cache:
-            robots_content = await self.fetch_robots_txt(base_url)
-            rules = self.parse_robots_txt(robots_content)
-            self.robots_cache[base_url] = rules
-        else:
-            rules = self.robots_cache[base_url]
+        matcher = self._host_matchers.get(base_url)
+        if matcher is None:
+            matcher = await self.get_host_matcher(base_url)
+        return matcher(parsed_url.path or "/")
 
-        # Get crawl delay
-        crawl_delay = self.get_crawl_delay(rules)
-
-        # Check if URL is allowed
+    def _compile_disallow_rules(self, rules: Dict[str, List[str]]) -> Optional[Pattern[str]]:
+        """Compile the Disallow prefixes that apply to our user agent into a single regex."""
         user_agent_rules = []
 
         # Try to find rules for our specific user agent
@@ -124,18 +224,24 @@ class RobotsParser:
         elif "*" in rules:
             user_agent_rules = rules["*"]
 
-        # Check if the URL path matches any disallow rule
-        for rule in user_agent_rules:
-            if path.startswith(rule):
-                return False, crawl_delay
-
-        # If no matching disallow rule, the URL is allowed
-        return True, crawl_delay
+        if not user_agent_rules:
+            return None
+        return re.compile("|".join(re.escape(rule) for rule in user_agent_rules))
 
-    def get_allowed_urls(self, base_url: str, urls: List[str]) -> List[str]:
+    async def get_allowed_urls(self, base_url: str, urls: List[str]) -> List[str]:
         """Filter a list of URLs to only those allowed by robots.txt."""
-        allowed_urls = []
-        for url in urls:
-            if self.is_allowed(url)[0]:
-                allowed_urls.append(url)
-        return allowed_urls
\ No newline at end of file
+        parsed_urls = [urlparse(url) for url in urls]
+        hosts = list({f"{parsed.scheme}://{parsed.netloc}" for parsed in parsed_urls})
+
+        # Load each host's rules once, concurrently, then check every URL against its host's matcher
+        semaphore = asyncio.Semaphore(50)
+
+        async def load(host: str) -> Callable[[str], Tuple[bool, float]]:
+            async with semaphore:
+                return await self.get_host_matcher(host)
+
+        matchers = dict(zip(hosts, await asyncio.gather(*(load(host) for host in hosts))))
+        return [
+            url for url, parsed in zip(urls, parsed_urls)
+            if matchers[f"{parsed.scheme}://{parsed.netloc}"](parsed.path or "/")[0]
+        ]
\ No newline at end of file
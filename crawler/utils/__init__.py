@@ -0,0 +1,3 @@
+"""Helpers shared by the crawler modules."""
+
+# No imports here - the submodules are imported directly where they are used
@@ -0,0 +1,101 @@
+"""
+HTTP and HTML parsing helpers shared by the crawler, extractor, robots parser and manager.
+"""
+
+import sys
+import threading
+from functools import lru_cache
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+import lxml.html
+from lxml import etree
+
+try:
+    import brotli  # noqa: F401 - aiohttp decodes 'br' responses when this is importable
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+try:
+    import aiodns  # noqa: F401 - aiohttp's AsyncResolver (c-ares) needs this
+    from aiohttp.resolver import AsyncResolver
+except ImportError:
+    AsyncResolver = None
+
+# Aborted TLS connections leak on Pythons without the CPython fix (3.12.7 / 3.13.1);
+# newer aiohttp warns when asked to clean them up where that isn't needed
+_CLEANUP_CLOSED = sys.version_info < (3, 12, 7) or (3, 13, 0) <= sys.version_info < (3, 13, 1)
+
+# Comments and processing instructions are never extracted, so they are dropped instead
+# of becoming tree nodes. huge_tree lifts libxml2's size limits for very large listing and
+# index pages, and nothing looks elements up by ID, so the ID table isn't built.
+PARSER_OPTIONS = dict(recover=True, remove_comments=True, remove_pis=True, huge_tree=True, collect_ids=False)
+
+_parser_local = threading.local()
+
+
+@lru_cache(maxsize=16384)
+def netloc(url: str) -> str:
+    """Return the network location of a URL, memoized since the same URLs recur constantly."""
+    return urlparse(url).netloc
+
+
+def browser_headers(user_agent: str) -> Dict[str, str]:
+    """Request headers for fetching pages as the given crawler user agent."""
+    return {
+        "User-Agent": f"{user_agent}/1.0",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.5",
+        "Accept-Encoding": ACCEPT_ENCODING,
+        "Connection": "keep-alive"
+    }
+
+
+def create_session(limit: int = 100, limit_per_host: int = 0, keepalive_timeout: float = 30,
+                   headers: Optional[Dict[str, str]] = None, async_dns: bool = False) -> aiohttp.ClientSession:
+    """Create an HTTP session with a pooled keep-alive connector and a 30 second timeout.
+
+    limit and limit_per_host cap connections overall and per host (0 means no cap).
+    With async_dns, lookups go through aiodns's c-ares resolver when it is installed
+    instead of queueing on the default resolver's getaddrinfo threads.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        ttl_dns_cache=300,
+        keepalive_timeout=keepalive_timeout,
+        enable_cleanup_closed=_CLEANUP_CLOSED,
+        resolver=AsyncResolver() if async_dns and AsyncResolver is not None else None
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers=headers,
+        timeout=aiohttp.ClientTimeout(total=30)
+    )
+
+
+def get_parser() -> lxml.html.HTMLParser:
+    """Return this thread's lxml HTML parser, created on first use and reused for every page.
+
+    lxml parsers are not thread-safe, hence one per thread.
+    """
+    parser = getattr(_parser_local, 'parser', None)
+    if parser is None:
+        parser = _parser_local.parser = lxml.html.HTMLParser(**PARSER_OPTIONS)
+    return parser
+
+
+def parse_document(html: str) -> Optional[lxml.html.HtmlElement]:
+    """Parse a page with lxml, returning None if there is no document to parse."""
+    parser = get_parser()
+    try:
+        try:
+            return lxml.html.document_fromstring(html, parser=parser)
+        except ValueError:
+            # lxml refuses str input that carries an XML encoding declaration
+            return lxml.html.document_fromstring(html.encode('utf-8'), parser=parser)
+    except etree.ParserError:
+        # Document is empty (e.g. whitespace only)
+        return None
@@ -0,0 +1,65 @@
+"""
+Process pool for the crawler's CPU-bound page parsing and extraction.
+
+The pool is opt-in: it is only used when CRAWLER_PROCESS_POOL is set (or a crawler's
+or extractor's use_process_pool is switched on); otherwise the work runs in a thread.
+Workers are started with forkserver (or spawn where that is unavailable), never fork:
+the backend runs threads of its own, and a forked child would inherit their locks.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default for use_process_pool on extractors and domain crawlers
+PROCESS_POOL_ENABLED = os.getenv('CRAWLER_PROCESS_POOL', '').lower() in ('1', 'true', 'yes')
+
+# Worker processes in the pool; defaults to one per core
+PROCESS_POOL_WORKERS = int(os.getenv('CRAWLER_PROCESS_POOL_WORKERS', '0')) or os.cpu_count() or 1
+
+# Seconds a page may take in a worker before the caller gives up on it
+PROCESS_POOL_TIMEOUT = float(os.getenv('CRAWLER_PROCESS_POOL_TIMEOUT', '60'))
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the shared process pool, starting it on first use."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _process_pool = ProcessPoolExecutor(
+                max_workers=PROCESS_POOL_WORKERS,
+                mp_context=multiprocessing.get_context(method)
+            )
+        return _process_pool
+
+
+async def run_in_process_pool(func: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+    """Run func(*args) in the shared process pool and wait for its result.
+
+    Raises asyncio.TimeoutError after timeout seconds (PROCESS_POOL_TIMEOUT by default).
+    The worker still finishes the call in the background; only its result is dropped.
+    """
+    loop = asyncio.get_running_loop()
+    return await asyncio.wait_for(
+        loop.run_in_executor(get_process_pool(), func, *args),
+        PROCESS_POOL_TIMEOUT if timeout is None else timeout
+    )
+
+
+def shutdown_process_pool(wait: bool = True) -> None:
+    """Stop the shared process pool's workers, if it was started; it restarts on next use."""
+    global _process_pool
+    with _process_pool_lock:
+        pool, _process_pool = _process_pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=True)